@@ -1,14 +1,393 @@
 import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 import folium
-from streamlit_folium import st_folium
-from datetime import datetime, timedelta
+from folium.plugins import FastMarkerCluster
 from database import DatabaseManager
 from demo_data import demo_data
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Chart colors by severity level
+SEVERITY_COLORS = {
+    'Critical': '#d62728',
+    'High': '#ff7f0e',
+    'Medium': '#ffbb78',
+    'Low': '#2ca02c'
+}
+
+# Map marker colors by segment status
+STATUS_COLORS = {
+    "Critical": "red",
+    "High": "orange",
+    "Medium": "yellow",
+    "Good": "green"
+}
+
+# Sample maintenance cost data
+COST_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun')
+PREVENTIVE_COSTS = np.array([15000, 12000, 18000, 14000, 16000, 13000])
+CORRECTIVE_COSTS = np.array([45000, 0, 25000, 0, 35000, 20000])
+
+# Segment count above which map markers are drawn client-side in one batch
+FAST_MARKER_THRESHOLD = 50
+
+# Leaflet callback used by FastMarkerCluster: row = [lat, lon, color, popup_html]
+_FAST_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 10, color: row[2], fill: true, fillColor: row[2], fillOpacity: 0.7
+    });
+    marker.bindPopup(row[3], {maxWidth: 200});
+    return marker;
+}
+"""
+
+# Cached demo data fetchers (Streamlit reruns the script on every interaction)
+@st.cache_data(ttl=60)
+def _cached_segments():
+    """Get pipeline segments"""
+    return demo_data.get_pipeline_segments()
+
+@st.cache_data(ttl=60)
+def _cached_inspections():
+    """Get inspection history"""
+    return demo_data.get_inspection_history()
+
+@st.cache_data(ttl=60)
+def _cached_alerts():
+    """Get pending alerts"""
+    return demo_data.get_pending_alerts()
+
+@st.cache_data(ttl=60)
+def _cached_monthly_count():
+    """Get current month inspection count"""
+    return demo_data.get_monthly_inspection_count()
+
+@st.cache_data(ttl=60)
+def _cached_summary():
+    """Get overall detection summary"""
+    return demo_data.get_detection_summary()
+
+# Seeded demo series, generated once per process
+@st.cache_data
+def _demo_trend_series():
+    """Generate monthly total and critical detection counts"""
+    months = np.arange('2024-01', '2025-01', dtype='datetime64[M]')
+    rng = np.random.default_rng(0)
+    return months, rng.poisson(15, len(months)), rng.poisson(2, len(months))
+
+@st.cache_data
+def _demo_confidence_scores(n: int = 1000):
+    """Generate detection confidence scores"""
+    rng = np.random.default_rng(1)
+    return rng.beta(2, 1, n)  # Beta distribution for realistic confidence scores
+
+@st.cache_data
+def _demo_detection_characteristics(n: int = 100):
+    """Generate detection area, confidence and severity samples"""
+    rng = np.random.default_rng(2)
+    return {
+        'Area (px²)': rng.lognormal(7, 1, n),
+        'Confidence': rng.beta(2, 1, n),
+        'Severity': rng.choice(['Low', 'Medium', 'High', 'Critical'], n, p=[0.4, 0.35, 0.2, 0.05])
+    }
+
+@st.cache_data
+def _historical_df():
+    """Simulate weekly corrosion rate progression and detection counts"""
+    dates = pd.date_range(start='2023-01-01', end='2024-12-31', freq='W')
+    n_weeks = len(dates)
+    
+    rng = np.random.default_rng(42)
+    base_trend = np.linspace(10, 25, n_weeks)
+    seasonal_pattern = 5 * np.sin(2 * np.pi * np.arange(n_weeks) / 52)
+    noise = rng.normal(0, 2, n_weeks)
+    corrosion_rate = base_trend + seasonal_pattern + noise
+    
+    return pd.DataFrame({
+        'Date': dates,
+        'Corrosion_Rate': corrosion_rate,
+        'Detection_Count': rng.poisson(corrosion_rate/2, n_weeks)
+    })
+
+@st.cache_data
+def _schedule_df():
+    """Build the typed sample maintenance schedule"""
+    schedule_data = {
+        'Segment': ['Segment A', 'Segment D', 'Segment C', 'Segment B'],
+        'Priority': ['Critical', 'High', 'Medium', 'Low'],
+        'Scheduled Date': pd.to_datetime(['2025-01-15', '2025-02-01', '2025-03-15', '2025-06-01']),
+        'Type': ['Emergency Repair', 'Planned Maintenance', 'Inspection', 'Routine Check'],
+        'Estimated Cost': ['$50,000', '$25,000', '$5,000', '$2,000']
+    }
+    
+    return pd.DataFrame(schedule_data).astype({
+        'Segment': 'string',
+        'Priority': 'category',
+        'Type': 'string',
+        'Estimated Cost': 'string'
+    })
+
+# Cached figure builders (only st.plotly_chart runs on rerun).
+# Numeric trace data is passed as numpy arrays so Plotly's JSON encoder
+# serializes it in bulk rather than element by element.
+@st.cache_resource
+def _build_corrosion_trends_figure():
+    """Build corrosion detection trends figure"""
+    # Sample data for demonstration
+    months, detection_counts, critical_counts = _demo_trend_series()
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=detection_counts,
+        mode='lines+markers',
+        name='Total Detections',
+        line=dict(color='#1f77b4')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=critical_counts,
+        mode='lines+markers',
+        name='Critical Detections',
+        line=dict(color='#d62728')
+    ))
+    
+    fig.update_layout(
+        title="Corrosion Detection Trends",
+        xaxis_title="Date",
+        yaxis_title="Number of Detections",
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@st.cache_resource
+def _build_severity_pie(severities: tuple, counts: tuple):
+    """Build severity distribution pie chart"""
+    fig = px.pie(
+        values=np.asarray(counts),
+        names=list(severities),
+        color=list(severities),
+        color_discrete_map=SEVERITY_COLORS
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(title="Current Severity Distribution")
+    
+    return fig
+
+@st.cache_resource
+def _build_algorithm_performance_figure(methods: tuple, accuracy: tuple, precision: tuple, recall: tuple):
+    """Build algorithm performance bar chart"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(name='Accuracy', x=list(methods), y=np.asarray(accuracy), marker_color='#1f77b4'))
+    fig.add_trace(go.Bar(name='Precision', x=list(methods), y=np.asarray(precision), marker_color='#ff7f0e'))
+    fig.add_trace(go.Bar(name='Recall', x=list(methods), y=np.asarray(recall), marker_color='#2ca02c'))
+    
+    fig.update_layout(
+        title="Algorithm Performance Metrics (%)",
+        xaxis_title="Detection Method",
+        yaxis_title="Performance (%)",
+        barmode='group'
+    )
+    
+    return fig
+
+@st.cache_resource
+def _build_confidence_distribution_figure():
+    """Build confidence score histogram"""
+    # Sample confidence data
+    confidence_scores = _demo_confidence_scores()
+    
+    fig = px.histogram(
+        x=confidence_scores,
+        nbins=20,
+        title="Detection Confidence Distribution",
+        labels={'x': 'Confidence Score', 'y': 'Frequency'}
+    )
+    
+    fig.update_layout(
+        xaxis=dict(tickformat='.1%'),
+        showlegend=False
+    )
+    
+    return fig
+
+@st.cache_resource
+def _build_detection_characteristics_figure():
+    """Build detection area vs confidence scatter plot"""
+    # Sample data for detection characteristics
+    df = pd.DataFrame(_demo_detection_characteristics())
+    
+    # WebGL scatter of area vs confidence, one trace per severity
+    fig = go.Figure()
+    for severity, group in df.groupby('Severity', sort=False):
+        fig.add_trace(go.Scattergl(
+            x=group['Area (px²)'].to_numpy(),
+            y=group['Confidence'].to_numpy(),
+            mode='markers',
+            name=severity,
+            marker=dict(color=SEVERITY_COLORS[severity])
+        ))
+    
+    fig.update_layout(
+        title="Detection Area vs Confidence by Severity",
+        xaxis_title="Area (px²)",
+        yaxis_title="Confidence",
+        legend_title_text="Severity",
+        xaxis_type="log",
+        yaxis=dict(tickformat='.1%')
+    )
+    
+    return fig
+
+@st.cache_resource
+def _build_historical_analysis_figure():
+    """Build corrosion rate vs detection count figure"""
+    # Sample historical data
+    df = _historical_df()
+    
+    # Create subplot with secondary y-axis
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    fig.add_trace(
+        go.Scatter(x=df['Date'], y=df['Corrosion_Rate'], name="Corrosion Rate"),
+        secondary_y=False,
+    )
+    
+    fig.add_trace(
+        go.Scatter(x=df['Date'], y=df['Detection_Count'], name="Detection Count", line=dict(color='red')),
+        secondary_y=True,
+    )
+    
+    fig.update_xaxes(title_text="Date")
+    fig.update_yaxes(title_text="Corrosion Rate (mm/year)", secondary_y=False)
+    fig.update_yaxes(title_text="Detection Count", secondary_y=True)
+    
+    fig.update_layout(title="Corrosion Rate vs Detection Count Over Time")
+    
+    return fig
+
+@st.cache_resource
+def _build_priority_matrix_figure(segments: tuple, risk_scores: tuple, urgency_scores: tuple, priorities: tuple):
+    """Build risk vs urgency scatter plot"""
+    fig = px.scatter(
+        x=np.asarray(risk_scores),
+        y=np.asarray(urgency_scores),
+        text=list(segments),
+        color=list(priorities),
+        color_discrete_map=SEVERITY_COLORS,
+        title="Risk vs Urgency Matrix"
+    )
+    
+    fig.update_traces(textposition="middle center", marker_size=20)
+    fig.update_layout(
+        xaxis_title="Risk Score",
+        yaxis_title="Urgency Score",
+        showlegend=True
+    )
+    
+    return fig
+
+@st.cache_resource
+def _build_cost_analysis_figure():
+    """Build preventive vs corrective cost bar chart"""
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Preventive Maintenance',
+        x=list(COST_MONTHS),
+        y=PREVENTIVE_COSTS,
+        marker_color='#2ca02c'
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Corrective Maintenance',
+        x=list(COST_MONTHS),
+        y=CORRECTIVE_COSTS,
+        marker_color='#d62728'
+    ))
+    
+    fig.update_layout(
+        title="Maintenance Costs: Preventive vs Corrective",
+        xaxis_title="Month",
+        yaxis_title="Cost ($)",
+        barmode='stack'
+    )
+    
+    return fig
+
+@st.cache_data
+def _build_pipeline_map_html(map_key: tuple) -> str:
+    """Build the pipeline network map and serialize it to HTML"""
+    pipeline_segments = [
+        {"lat": lat, "lon": lon, "status": status, "popup_html": popup_html}
+        for lat, lon, status, popup_html in map_key
+    ]
+    
+    # Create pipeline map
+    m = folium.Map(location=[29.7604, -95.3698], zoom_start=10, prefer_canvas=True)  # Houston area
+    
+    if len(pipeline_segments) >= FAST_MARKER_THRESHOLD:
+        # Large networks: ship markers as one JS array instead of per-marker objects
+        marker_data = [
+            [
+                segment["lat"],
+                segment["lon"],
+                STATUS_COLORS[segment["status"]],
+                segment["popup_html"]
+            ]
+            for segment in pipeline_segments
+        ]
+        FastMarkerCluster(marker_data, callback=_FAST_MARKER_CALLBACK).add_to(m)
+    else:
+        for segment in pipeline_segments:
+            folium.CircleMarker(
+                location=[segment["lat"], segment["lon"]],
+                radius=10,
+                popup=folium.Popup(segment["popup_html"], max_width=200),
+                color=STATUS_COLORS[segment["status"]],
+                fill=True,
+                fillColor=STATUS_COLORS[segment["status"]],
+                fillOpacity=0.7
+            ).add_to(m)
+    
+    # Add pipeline lines
+    pipeline_coords = [[seg["lat"], seg["lon"]] for seg in pipeline_segments]
+    folium.PolyLine(
+        locations=pipeline_coords,
+        color="blue",
+        weight=3,
+        opacity=0.8,
+        popup="Main Pipeline"
+    ).add_to(m)
+    
+    return m.get_root().render()
+
+def _format_elapsed(deltas: pd.Series) -> np.ndarray:
+    """Format elapsed timedeltas as 'N days/hours/minutes ago' strings"""
+    days = deltas.dt.days
+    seconds = deltas.dt.seconds
+    hours = seconds // 3600
+    minutes = seconds // 60
+    
+    def _ago(count, unit):
+        return count.astype(str) + f" {unit}" + np.where(count > 1, "s", "") + " ago"
+    
+    return np.select(
+        [days > 0, seconds > 3600],
+        [_ago(days, "day"), _ago(hours, "hour")],
+        default=_ago(minutes, "minute")
+    )
 
 class AnalyticsDashboard:
     """Advanced analytics dashboard for pipeline corrosion management"""
@@ -21,29 +400,38 @@ class AnalyticsDashboard:
         st.header("📊 Executive Dashboard")
         st.markdown("### Pipeline Corrosion Management Overview")
         
+        # Fetch independent KPI data concurrently (worker threads share the script context)
+        ctx = get_script_run_ctx()
+        with ThreadPoolExecutor(max_workers=4, initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+            monthly_future = executor.submit(_cached_monthly_count)
+            alerts_future = executor.submit(_cached_alerts)
+            summary_future = executor.submit(_cached_summary)
+            segments_future = executor.submit(_cached_segments)
+        
         # KPI Metrics Row
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             # Total inspections this month using demo data
-            monthly_inspections = demo_data.get_monthly_inspection_count()
+            monthly_inspections = monthly_future.result()
             st.metric("Monthly Inspections", monthly_inspections)
         
         with col2:
             # Critical alerts using demo data
-            alerts = demo_data.get_pending_alerts()
-            critical_alerts = len([a for a in alerts if a['severity'] == 'Critical'])
+            alerts = alerts_future.result()
+            alert_severity_counts = pd.Series([a['severity'] for a in alerts], dtype=object).value_counts()
+            critical_alerts = int(alert_severity_counts.get('Critical', 0))
             st.metric("Critical Alerts", critical_alerts, delta=None if critical_alerts == 0 else f"+{critical_alerts}")
         
         with col3:
             # Average detection confidence using demo data
-            summary = demo_data.get_detection_summary()
+            summary = summary_future.result()
             avg_confidence = summary['avg_confidence']
             st.metric("Avg Detection Confidence", f"{avg_confidence:.1%}")
         
         with col4:
             # Pipeline segments monitored
-            segments = demo_data.get_pipeline_segments()
+            segments = segments_future.result()
             st.metric("Pipeline Segments", len(segments), help="Active pipeline segments being monitored")
         
         # Charts Row
@@ -64,42 +452,13 @@ class AnalyticsDashboard:
             self._render_pipeline_map()
         
         with col_alerts:
-            self._render_alert_panel()
+            self._render_alert_panel(alerts)
     
     def _render_corrosion_trends_chart(self):
         """Render corrosion trends over time"""
         st.subheader("Corrosion Detection Trends")
         
-        # Sample data for demonstration
-        dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='M')
-        detection_counts = np.random.poisson(15, len(dates))
-        critical_counts = np.random.poisson(2, len(dates))
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=detection_counts,
-            mode='lines+markers',
-            name='Total Detections',
-            line=dict(color='#1f77b4')
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=critical_counts,
-            mode='lines+markers',
-            name='Critical Detections',
-            line=dict(color='#d62728')
-        ))
-        
-        fig.update_layout(
-            title="Corrosion Detection Trends",
-            xaxis_title="Date",
-            yaxis_title="Number of Detections",
-            hovermode='x unified'
-        )
-        
+        fig = _build_corrosion_trends_figure()
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_severity_distribution(self):
@@ -107,145 +466,77 @@ class AnalyticsDashboard:
         st.subheader("Severity Distribution")
         
         # Sample data
-        severity_data = {
-            'Severity': ['Critical', 'High', 'Medium', 'Low'],
-            'Count': [5, 12, 28, 45],
-            'Color': ['#d62728', '#ff7f0e', '#ffbb78', '#2ca02c']
-        }
-        
-        fig = px.pie(
-            values=severity_data['Count'],
-            names=severity_data['Severity'],
-            color=severity_data['Severity'],
-            color_discrete_map={
-                'Critical': '#d62728',
-                'High': '#ff7f0e',
-                'Medium': '#ffbb78',
-                'Low': '#2ca02c'
-            }
+        fig = _build_severity_pie(
+            ('Critical', 'High', 'Medium', 'Low'),
+            (5, 12, 28, 45)
         )
-        
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(title="Current Severity Distribution")
-        
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_pipeline_map(self):
         """Render interactive pipeline map"""
         st.subheader("Pipeline Network Map")
         
-        # Create pipeline map using demo data
-        m = folium.Map(location=[29.7604, -95.3698], zoom_start=10)  # Houston area
-        
         # Get pipeline segments from demo data
-        segments = demo_data.get_pipeline_segments()
-        inspections = demo_data.get_inspection_history()
-        
-        # Create pipeline segments with recent inspection data
-        pipeline_segments = []
-        for segment in segments:
-            # Get recent inspections for this segment
-            segment_inspections = [i for i in inspections if i['segment_id'] == segment['id']]
-            recent_inspection = max(segment_inspections, key=lambda x: x['inspection_date']) if segment_inspections else None
-            
-            if recent_inspection:
-                detections = recent_inspection['total_detections']
-                if recent_inspection['max_severity'] == 'Critical':
-                    status = "Critical"
-                elif recent_inspection['max_severity'] == 'High':
-                    status = "High"
-                elif recent_inspection['max_severity'] == 'Medium':
-                    status = "Medium"
-                else:
-                    status = "Good"
-            else:
-                detections = 0
-                status = "Good"
-            
-            pipeline_segments.append({
-                "lat": segment['latitude'],
-                "lon": segment['longitude'],
-                "name": segment['segment_name'],
-                "status": status,
-                "detections": detections
-            })
-        
-        # Color mapping for status
-        color_map = {
-            "Critical": "red",
-            "High": "orange", 
-            "Medium": "yellow",
-            "Good": "green"
-        }
+        segments = _cached_segments()
+        inspections = _cached_inspections()
         
-        for segment in pipeline_segments:
-            folium.CircleMarker(
-                location=[segment["lat"], segment["lon"]],
-                radius=10,
-                popup=folium.Popup(
-                    f"<b>{segment['name']}</b><br>"
-                    f"Status: {segment['status']}<br>"
-                    f"Detections: {segment['detections']}",
-                    max_width=200
-                ),
-                color=color_map[segment["status"]],
-                fill=True,
-                fillColor=color_map[segment["status"]],
-                fillOpacity=0.7
-            ).add_to(m)
+        # Most recent inspection per segment in a single groupby pass
+        inspections_df = pd.DataFrame(
+            inspections, columns=['segment_id', 'inspection_date', 'total_detections', 'max_severity']
+        )
+        if not inspections_df.empty:
+            inspections_df = inspections_df.loc[inspections_df.groupby('segment_id')['inspection_date'].idxmax()]
+        recent_inspections = inspections_df.rename(columns={'segment_id': 'id', 'total_detections': 'detections'})
+        
+        # Attach recent inspection status to pipeline segments
+        segments_df = pd.DataFrame(segments, columns=['id', 'segment_name', 'latitude', 'longitude'])
+        segments_df = segments_df.merge(recent_inspections[['id', 'detections', 'max_severity']], on='id', how='left')
+        segments_df['status'] = segments_df['max_severity'].where(
+            segments_df['max_severity'].isin(['Critical', 'High', 'Medium']), 'Good'
+        )
+        segments_df['detections'] = segments_df['detections'].fillna(0).astype(int)
         
-        # Add pipeline lines
-        pipeline_coords = [[seg["lat"], seg["lon"]] for seg in pipeline_segments]
-        folium.PolyLine(
-            locations=pipeline_coords,
-            color="blue",
-            weight=3,
-            opacity=0.8,
-            popup="Main Pipeline"
-        ).add_to(m)
+        # Pre-render all popup HTML in one column-wise pass
+        segments_df['popup_html'] = (
+            '<b>' + segments_df['segment_name'] + '</b><br>'
+            'Status: ' + segments_df['status'] + '<br>'
+            'Detections: ' + segments_df['detections'].astype(str)
+        )
         
-        map_data = st_folium(m, width=700, height=400)
+        # Reuse the serialized map while segment statuses are unchanged
+        map_key = tuple(
+            segments_df[['latitude', 'longitude', 'status', 'popup_html']]
+            .itertuples(index=False, name=None)
+        )
+        html = _build_pipeline_map_html(map_key)
+        components.html(html, width=700, height=420, scrolling=False)
     
-    def _render_alert_panel(self):
+    def _render_alert_panel(self, alerts=None):
         """Render system alerts panel"""
         st.subheader("🚨 System Alerts")
         
-        # Get alerts from demo data
-        alerts = demo_data.get_pending_alerts()[:5]  # Show top 5 alerts
+        # Get alerts from demo data unless already fetched by the caller
+        if alerts is None:
+            alerts = _cached_alerts()
+        alerts = alerts[:5]  # Show top 5 alerts
         
         # Convert to display format
-        display_alerts = []
-        for alert in alerts:
-            time_diff = datetime.now() - alert['created_at']
-            if time_diff.days > 0:
-                time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
-            elif time_diff.seconds > 3600:
-                hours = time_diff.seconds // 3600
-                time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
-            else:
-                minutes = time_diff.seconds // 60
-                time_str = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-            
-            display_alerts.append({
-                "type": alert['alert_type'],
-                "message": alert['message'],
-                "time": time_str,
-                "severity": alert['severity']
-            })
-        
-        for alert in display_alerts:
+        alerts_df = pd.DataFrame(alerts, columns=['alert_type', 'message', 'severity', 'created_at'])
+        alerts_df['time'] = _format_elapsed(pd.Timestamp.now() - pd.to_datetime(alerts_df['created_at']))
+        
+        for alert in alerts_df.itertuples(index=False):
             with st.container():
-                if alert["severity"] == "Critical":
-                    st.error(f"🔴 **{alert['type']}**")
-                elif alert["severity"] == "High":
-                    st.warning(f"🟡 **{alert['type']}**")
-                elif alert["severity"] == "Medium":
-                    st.warning(f"🟠 **{alert['type']}**")
+                if alert.severity == "Critical":
+                    st.error(f"🔴 **{alert.alert_type}**")
+                elif alert.severity == "High":
+                    st.warning(f"🟡 **{alert.alert_type}**")
+                elif alert.severity == "Medium":
+                    st.warning(f"🟠 **{alert.alert_type}**")
                 else:
-                    st.info(f"🔵 **{alert['type']}**")
+                    st.info(f"🔵 **{alert.alert_type}**")
                 
-                st.write(f"{alert['message']}")
-                st.caption(f"*{alert['time']}*")
+                st.write(f"{alert.message}")
+                st.caption(f"*{alert.time}*")
                 st.markdown("---")
     
     def render_technical_dashboard(self):
@@ -273,121 +564,33 @@ class AnalyticsDashboard:
         """Render algorithm performance metrics"""
         st.subheader("Detection Algorithm Performance")
         
-        methods = ['Color Analysis', 'Texture Analysis', 'Edge Detection', 'Combined']
-        accuracy = [85, 78, 72, 92]
-        precision = [82, 80, 68, 89]
-        recall = [88, 76, 75, 94]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(name='Accuracy', x=methods, y=accuracy, marker_color='#1f77b4'))
-        fig.add_trace(go.Bar(name='Precision', x=methods, y=precision, marker_color='#ff7f0e'))
-        fig.add_trace(go.Bar(name='Recall', x=methods, y=recall, marker_color='#2ca02c'))
-        
-        fig.update_layout(
-            title="Algorithm Performance Metrics (%)",
-            xaxis_title="Detection Method",
-            yaxis_title="Performance (%)",
-            barmode='group'
-        )
+        methods = ('Color Analysis', 'Texture Analysis', 'Edge Detection', 'Combined')
+        accuracy = (85, 78, 72, 92)
+        precision = (82, 80, 68, 89)
+        recall = (88, 76, 75, 94)
         
+        fig = _build_algorithm_performance_figure(methods, accuracy, precision, recall)
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_confidence_distribution(self):
         """Render confidence score distribution"""
         st.subheader("Confidence Score Distribution")
         
-        # Sample confidence data
-        confidence_scores = np.random.beta(2, 1, 1000)  # Beta distribution for realistic confidence scores
-        
-        fig = px.histogram(
-            x=confidence_scores,
-            nbins=20,
-            title="Detection Confidence Distribution",
-            labels={'x': 'Confidence Score', 'y': 'Frequency'}
-        )
-        
-        fig.update_layout(
-            xaxis=dict(tickformat='.1%'),
-            showlegend=False
-        )
-        
+        fig = _build_confidence_distribution_figure()
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_detection_characteristics(self):
         """Render detection characteristics analysis"""
         st.subheader("Detection Characteristics Analysis")
         
-        # Sample data for detection characteristics
-        detection_data = {
-            'Area (px²)': np.random.lognormal(7, 1, 100),
-            'Confidence': np.random.beta(2, 1, 100),
-            'Severity': np.random.choice(['Low', 'Medium', 'High', 'Critical'], 100, p=[0.4, 0.35, 0.2, 0.05])
-        }
-        
-        df = pd.DataFrame(detection_data)
-        
-        # Scatter plot of area vs confidence, colored by severity
-        fig = px.scatter(
-            df,
-            x='Area (px²)',
-            y='Confidence',
-            color='Severity',
-            color_discrete_map={
-                'Low': '#2ca02c',
-                'Medium': '#ffbb78',
-                'High': '#ff7f0e',
-                'Critical': '#d62728'
-            },
-            title="Detection Area vs Confidence by Severity"
-        )
-        
-        fig.update_layout(
-            xaxis_type="log",
-            yaxis=dict(tickformat='.1%')
-        )
-        
+        fig = _build_detection_characteristics_figure()
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_historical_analysis(self):
         """Render historical trend analysis"""
         st.subheader("Historical Trend Analysis")
         
-        # Sample historical data
-        dates = pd.date_range(start='2023-01-01', end='2024-12-31', freq='W')
-        
-        # Simulate corrosion progression over time
-        np.random.seed(42)
-        base_trend = np.linspace(10, 25, len(dates))
-        seasonal_pattern = 5 * np.sin(2 * np.pi * np.arange(len(dates)) / 52)
-        noise = np.random.normal(0, 2, len(dates))
-        corrosion_rate = base_trend + seasonal_pattern + noise
-        
-        df = pd.DataFrame({
-            'Date': dates,
-            'Corrosion_Rate': corrosion_rate,
-            'Detection_Count': np.random.poisson(corrosion_rate/2, len(dates))
-        })
-        
-        # Create subplot with secondary y-axis
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig.add_trace(
-            go.Scatter(x=df['Date'], y=df['Corrosion_Rate'], name="Corrosion Rate"),
-            secondary_y=False,
-        )
-        
-        fig.add_trace(
-            go.Scatter(x=df['Date'], y=df['Detection_Count'], name="Detection Count", line=dict(color='red')),
-            secondary_y=True,
-        )
-        
-        fig.update_xaxes(title_text="Date")
-        fig.update_yaxes(title_text="Corrosion Rate (mm/year)", secondary_y=False)
-        fig.update_yaxes(title_text="Detection Count", secondary_y=True)
-        
-        fig.update_layout(title="Corrosion Rate vs Detection Count Over Time")
-        
+        fig = _build_historical_analysis_figure()
         st.plotly_chart(fig, use_container_width=True)
     
     def render_maintenance_dashboard(self):
@@ -412,87 +615,34 @@ class AnalyticsDashboard:
         st.subheader("Maintenance Priority Matrix")
         
         # Sample data for priority matrix
-        segments = ['Segment A', 'Segment B', 'Segment C', 'Segment D', 'Segment E']
-        risk_scores = [95, 45, 70, 85, 30]
-        urgency_scores = [90, 40, 60, 80, 25]
-        colors = ['Critical', 'Low', 'Medium', 'High', 'Low']
-        
-        fig = px.scatter(
-            x=risk_scores,
-            y=urgency_scores,
-            text=segments,
-            color=colors,
-            color_discrete_map={
-                'Critical': '#d62728',
-                'High': '#ff7f0e',
-                'Medium': '#ffbb78',
-                'Low': '#2ca02c'
-            },
-            title="Risk vs Urgency Matrix"
-        )
-        
-        fig.update_traces(textposition="middle center", marker_size=20)
-        fig.update_layout(
-            xaxis_title="Risk Score",
-            yaxis_title="Urgency Score",
-            showlegend=True
-        )
+        segments = ('Segment A', 'Segment B', 'Segment C', 'Segment D', 'Segment E')
+        risk_scores = (95, 45, 70, 85, 30)
+        urgency_scores = (90, 40, 60, 80, 25)
+        colors = ('Critical', 'Low', 'Medium', 'High', 'Low')
         
+        fig = _build_priority_matrix_figure(segments, risk_scores, urgency_scores, colors)
         st.plotly_chart(fig, use_container_width=True)
     
     def _render_maintenance_schedule(self):
         """Render maintenance schedule"""
         st.subheader("Maintenance Schedule")
         
-        # Sample maintenance schedule
-        schedule_data = {
-            'Segment': ['Segment A', 'Segment D', 'Segment C', 'Segment B'],
-            'Priority': ['Critical', 'High', 'Medium', 'Low'],
-            'Scheduled Date': ['2025-01-15', '2025-02-01', '2025-03-15', '2025-06-01'],
-            'Type': ['Emergency Repair', 'Planned Maintenance', 'Inspection', 'Routine Check'],
-            'Estimated Cost': ['$50,000', '$25,000', '$5,000', '$2,000']
-        }
-        
-        df = pd.DataFrame(schedule_data)
-        st.dataframe(df, use_container_width=True)
+        st.dataframe(
+            _schedule_df(),
+            column_config={'Scheduled Date': st.column_config.DateColumn()},
+            use_container_width=True
+        )
     
     def _render_cost_analysis(self):
         """Render maintenance cost analysis"""
         st.subheader("Maintenance Cost Analysis")
         
-        # Sample cost data
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-        preventive_costs = [15000, 12000, 18000, 14000, 16000, 13000]
-        corrective_costs = [45000, 0, 25000, 0, 35000, 20000]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Preventive Maintenance',
-            x=months,
-            y=preventive_costs,
-            marker_color='#2ca02c'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Corrective Maintenance',
-            x=months,
-            y=corrective_costs,
-            marker_color='#d62728'
-        ))
-        
-        fig.update_layout(
-            title="Maintenance Costs: Preventive vs Corrective",
-            xaxis_title="Month",
-            yaxis_title="Cost ($)",
-            barmode='stack'
-        )
-        
+        fig = _build_cost_analysis_figure()
         st.plotly_chart(fig, use_container_width=True)
         
         # Cost savings calculation
-        total_preventive = sum(preventive_costs)
-        total_corrective = sum(corrective_costs)
+        total_preventive = int(PREVENTIVE_COSTS.sum())
+        total_corrective = int(CORRECTIVE_COSTS.sum())
         
         col1, col2, col3 = st.columns(3)
         with col1:
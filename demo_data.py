@@ -4,18 +4,82 @@ This provides realistic sample data for demonstration purposes
 """
 import pandas as pd
 import numpy as np
+from collections import Counter
+from functools import cached_property
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import random
+from typing import Callable, Dict, List, Any
+import threading
+
+# Demo detection distributions, indexed like SEVERITY_LEVELS
+SEVERITY_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+SEVERITY_WEIGHTS = (0.5, 0.3, 0.15, 0.05)
+CONFIDENCE_RANGES = np.array([[0.50, 0.70], [0.60, 0.80], [0.75, 0.90], [0.85, 0.98]])
+AREA_RANGES = np.array([[200, 800], [500, 1500], [1000, 3000], [2000, 8000]])
+
+# Detections per inspection by pipeline type (other types: 0-6)
+DETECTION_COUNT_RANGES = {'subsea': (3, 15), 'industrial': (1, 8)}
+
+# Max severity candidates for inspections with <=5, 6-10 and >10 detections
+MAX_SEVERITY_CHOICES = np.array([['Low', 'Medium'], ['Medium', 'High'], ['High', 'Critical']])
+
+ALERT_TYPES = (
+    'Critical Corrosion Detected',
+    'Maintenance Due',
+    'Threshold Exceeded',
+    'System Health Check',
+    'Inspection Overdue'
+)
+SEGMENT_LABELS = ('A', 'B', 'C', 'D')
+
+# Seed for the demo generators, so every run shows the same data
+DEMO_SEED = 42
 
 class DemoDataProvider:
-    """Provides realistic demo data for the industrial pipeline system"""
+    """
+    Provides realistic demo data for the industrial pipeline system.
+    Each table is generated on first access and never changes afterwards,
+    so derived aggregates are computed once and reused.
+    """
+    
+    def __init__(self, seed: int = DEMO_SEED):
+        # One independent stream per generated table, so a table's contents
+        # do not depend on which table happens to be accessed first
+        self._rngs = dict(zip(
+            ('inspections', 'detections', 'alerts'),
+            (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3))
+        ))
+        self._tables = {}
+        # Reentrant: generating detections reads inspections, which reads segments
+        self._tables_lock = threading.RLock()
+    
+    def _table(self, name: str, generate: Callable[[], List[Dict]]) -> List[Dict]:
+        """Get a demo table, generating it on first access"""
+        # The dashboard reads from worker threads; the lock keeps dependent tables consistent
+        with self._tables_lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = self._tables[name] = generate()
+            return table
     
-    def __init__(self):
-        self.pipeline_segments = self._generate_pipeline_segments()
-        self.inspections = self._generate_inspection_history()
-        self.detections = self._generate_corrosion_detections()
-        self.alerts = self._generate_system_alerts()
+    @property
+    def pipeline_segments(self) -> List[Dict]:
+        """Pipeline segments"""
+        return self._table('pipeline_segments', self._generate_pipeline_segments)
+    
+    @property
+    def inspections(self) -> List[Dict]:
+        """Inspection history, newest first"""
+        return self._table('inspections', self._generate_inspection_history)
+    
+    @property
+    def detections(self) -> List[Dict]:
+        """Corrosion detections"""
+        return self._table('detections', self._generate_corrosion_detections)
+    
+    @property
+    def alerts(self) -> List[Dict]:
+        """System alerts, newest first"""
+        return self._table('alerts', self._generate_system_alerts)
     
     def _generate_pipeline_segments(self) -> List[Dict]:
         """Generate sample pipeline segments"""
@@ -73,108 +137,90 @@ class DemoDataProvider:
     
     def _generate_inspection_history(self) -> List[Dict]:
         """Generate sample inspection history"""
-        inspections = []
+        rng = self._rngs['inspections']
+        n = 50  # 50 inspections over 2 years
         
         # Generate inspections for the last 2 years
         start_date = datetime.now() - timedelta(days=730)
+        day_offsets = rng.integers(0, 730, n, endpoint=True)
         
-        for i in range(50):  # 50 inspections over 2 years
-            inspection_date = start_date + timedelta(days=random.randint(0, 730))
-            segment_id = random.choice([1, 2, 3, 4])
-            
-            # Generate realistic detection counts based on segment type
-            segment = next(s for s in self.pipeline_segments if s['id'] == segment_id)
-            if segment['pipeline_type'] == 'subsea':
-                total_detections = random.randint(3, 15)
-            elif segment['pipeline_type'] == 'industrial':
-                total_detections = random.randint(1, 8)
-            else:
-                total_detections = random.randint(0, 6)
-            
-            # Determine max severity based on detection count
-            if total_detections == 0:
-                max_severity = None
-            elif total_detections > 10:
-                max_severity = random.choice(['High', 'Critical'])
-            elif total_detections > 5:
-                max_severity = random.choice(['Medium', 'High'])
-            else:
-                max_severity = random.choice(['Low', 'Medium'])
-            
-            avg_confidence = random.uniform(0.65, 0.95) if total_detections > 0 else 0
-            
-            inspection = {
+        # Generate realistic detection counts based on segment type
+        segment_index = rng.integers(0, len(self.pipeline_segments), n)
+        segment_ids = np.array([s['id'] for s in self.pipeline_segments])[segment_index]
+        count_ranges = np.array([
+            DETECTION_COUNT_RANGES.get(s['pipeline_type'], (0, 6)) for s in self.pipeline_segments
+        ])[segment_index]
+        total_detections = rng.integers(count_ranges[:, 0], count_ranges[:, 1], endpoint=True)
+        
+        # Determine max severity based on detection count
+        tier = np.select([total_detections > 10, total_detections > 5], [2, 1], default=0)
+        max_severity = MAX_SEVERITY_CHOICES[tier, rng.integers(0, 2, n)].astype(object)
+        max_severity[total_detections == 0] = None
+        
+        avg_confidence = np.where(total_detections > 0, rng.uniform(0.65, 0.95, n), 0)
+        inspector_names = rng.choice(['John Smith', 'Sarah Johnson', 'Mike Wilson', 'Lisa Chen'], n)
+        inspection_methods = rng.choice(['AI Vision', 'Smart Pig', 'Manual', 'Combined'], n)
+        
+        inspections = [
+            {
                 'id': i + 1,
                 'segment_id': segment_id,
-                'inspection_date': inspection_date,
-                'inspector_name': random.choice(['John Smith', 'Sarah Johnson', 'Mike Wilson', 'Lisa Chen']),
-                'inspection_method': random.choice(['AI Vision', 'Smart Pig', 'Manual', 'Combined']),
-                'total_detections': total_detections,
-                'max_severity': max_severity,
-                'avg_confidence': avg_confidence
+                'inspection_date': start_date + timedelta(days=offset),
+                'inspector_name': inspector,
+                'inspection_method': method,
+                'total_detections': total,
+                'max_severity': severity,
+                'avg_confidence': confidence
             }
-            inspections.append(inspection)
+            for i, (segment_id, offset, inspector, method, total, severity, confidence) in enumerate(zip(
+                segment_ids.tolist(), day_offsets.tolist(), inspector_names.tolist(),
+                inspection_methods.tolist(), total_detections.tolist(), max_severity.tolist(),
+                avg_confidence.tolist()
+            ))
+        ]
         
         return sorted(inspections, key=lambda x: x['inspection_date'], reverse=True)
     
     def _generate_corrosion_detections(self) -> List[Dict]:
         """Generate sample corrosion detections"""
-        detections = []
-        detection_id = 1
+        rng = self._rngs['detections']
+        counts = [i['total_detections'] for i in self.inspections]
+        inspection_ids = np.repeat([i['id'] for i in self.inspections], counts)
+        n = len(inspection_ids)
         
-        for inspection in self.inspections:
-            if inspection['total_detections'] > 0:
-                for i in range(inspection['total_detections']):
-                    severity_weights = {
-                        'Low': 0.5,
-                        'Medium': 0.3,
-                        'High': 0.15,
-                        'Critical': 0.05
-                    }
-                    
-                    severity = random.choices(
-                        list(severity_weights.keys()),
-                        weights=list(severity_weights.values())
-                    )[0]
-                    
-                    # Adjust confidence based on severity
-                    if severity == 'Critical':
-                        confidence = random.uniform(0.85, 0.98)
-                        area = random.randint(2000, 8000)
-                    elif severity == 'High':
-                        confidence = random.uniform(0.75, 0.90)
-                        area = random.randint(1000, 3000)
-                    elif severity == 'Medium':
-                        confidence = random.uniform(0.60, 0.80)
-                        area = random.randint(500, 1500)
-                    else:
-                        confidence = random.uniform(0.50, 0.70)
-                        area = random.randint(200, 800)
-                    
-                    detection = {
-                        'id': detection_id,
-                        'inspection_id': inspection['id'],
-                        'detection_id': f'C{detection_id:03d}',
-                        'bbox': [
-                            random.randint(50, 800),  # x
-                            random.randint(50, 600),  # y
-                            random.randint(50, 200),  # width
-                            random.randint(50, 200)   # height
-                        ],
-                        'area': area,
-                        'confidence': confidence,
-                        'severity': severity,
-                        'risk_assessment': self._get_risk_assessment(severity),
-                        'shape_characteristics': {
-                            'circularity': random.uniform(0.3, 0.8),
-                            'aspect_ratio': random.uniform(1.0, 3.0),
-                            'extent': random.uniform(0.4, 0.9)
-                        }
-                    }
-                    detections.append(detection)
-                    detection_id += 1
+        # Severity first, then confidence and area drawn from its ranges
+        severity_index = rng.choice(len(SEVERITY_LEVELS), n, p=SEVERITY_WEIGHTS)
+        confidence_ranges = CONFIDENCE_RANGES[severity_index]
+        area_ranges = AREA_RANGES[severity_index]
+        confidence = rng.uniform(confidence_ranges[:, 0], confidence_ranges[:, 1])
+        area = rng.integers(area_ranges[:, 0], area_ranges[:, 1], endpoint=True)
         
-        return detections
+        # x, y, width, height and circularity, aspect ratio, extent
+        bbox = rng.integers([50, 50, 50, 50], [800, 600, 200, 200], size=(n, 4), endpoint=True)
+        shape = rng.uniform([0.3, 1.0, 0.4], [0.8, 3.0, 0.9], size=(n, 3))
+        
+        risk_assessments = [self._get_risk_assessment(s) for s in SEVERITY_LEVELS]
+        return [
+            {
+                'id': k + 1,
+                'inspection_id': inspection_id,
+                'detection_id': f'C{k + 1:03d}',
+                'bbox': box,
+                'area': a,
+                'confidence': c,
+                'severity': SEVERITY_LEVELS[level],
+                'risk_assessment': risk_assessments[level],
+                'shape_characteristics': {
+                    'circularity': circularity,
+                    'aspect_ratio': aspect_ratio,
+                    'extent': extent
+                }
+            }
+            for k, (inspection_id, level, c, a, box, (circularity, aspect_ratio, extent)) in enumerate(zip(
+                inspection_ids.tolist(), severity_index.tolist(), confidence.tolist(),
+                area.tolist(), bbox.tolist(), shape.tolist()
+            ))
+        ]
     
     def _get_risk_assessment(self, severity: str) -> str:
         """Get risk assessment based on severity"""
@@ -188,122 +234,136 @@ class DemoDataProvider:
     
     def _generate_system_alerts(self) -> List[Dict]:
         """Generate sample system alerts"""
-        alerts = []
+        rng = self._rngs['alerts']
+        n = 10
         
         # Generate recent alerts
-        for i in range(10):
-            alert_date = datetime.now() - timedelta(hours=random.randint(1, 168))  # Last week
-            
-            alert_types = [
-                'Critical Corrosion Detected',
-                'Maintenance Due',
-                'Threshold Exceeded',
-                'System Health Check',
-                'Inspection Overdue'
-            ]
-            
-            alert_type = random.choice(alert_types)
-            
+        now = datetime.now()
+        hours_ago = rng.integers(1, 168, n, endpoint=True)  # Last week
+        alert_types = rng.choice(ALERT_TYPES, n)
+        segments = rng.choice(SEGMENT_LABELS, n)
+        monitoring_severities = rng.choice(['Medium', 'Low'], n)
+        acknowledged = rng.integers(0, 2, n).astype(bool)
+        
+        alerts = []
+        for i, (hours, alert_type, segment, monitoring_severity, is_acknowledged) in enumerate(zip(
+            hours_ago.tolist(), alert_types.tolist(), segments.tolist(),
+            monitoring_severities.tolist(), acknowledged.tolist()
+        )):
             if 'Critical' in alert_type:
                 severity = 'Critical'
-                message = f"Critical corrosion detected in Segment {random.choice(['A', 'B', 'C', 'D'])}"
+                message = f"Critical corrosion detected in Segment {segment}"
             elif 'Maintenance' in alert_type or 'Overdue' in alert_type:
                 severity = 'High'
-                message = f"Maintenance action required for Segment {random.choice(['A', 'B', 'C', 'D'])}"
+                message = f"Maintenance action required for Segment {segment}"
             else:
-                severity = random.choice(['Medium', 'Low'])
-                message = f"System monitoring alert for Segment {random.choice(['A', 'B', 'C', 'D'])}"
+                severity = monitoring_severity
+                message = f"System monitoring alert for Segment {segment}"
             
             alert = {
                 'id': i + 1,
                 'alert_type': alert_type,
                 'severity': severity,
                 'message': message,
-                'created_at': alert_date,
-                'acknowledged': random.choice([True, False])
+                'created_at': now - timedelta(hours=hours),
+                'acknowledged': is_acknowledged
             }
             alerts.append(alert)
         
         return sorted(alerts, key=lambda x: x['created_at'], reverse=True)
     
+    @cached_property
+    def inspections_df(self) -> pd.DataFrame:
+        """Inspections as columns, for vectorized filtering"""
+        return pd.DataFrame(self.inspections, columns=[
+            'id', 'segment_id', 'inspection_date', 'total_detections', 'max_severity', 'avg_confidence'
+        ])
+    
+    @cached_property
+    def detections_df(self) -> pd.DataFrame:
+        """Detections as columns, for vectorized aggregation"""
+        return pd.DataFrame(self.detections, columns=['id', 'inspection_id', 'area', 'confidence', 'severity'])
+    
+    @cached_property
+    def _severity_by_inspection(self) -> pd.DataFrame:
+        """Detection counts indexed by inspection id, one column per severity level"""
+        return (
+            self.detections_df.groupby(['inspection_id', 'severity']).size()
+            .unstack(fill_value=0)
+            .reindex(columns=SEVERITY_LEVELS, fill_value=0)
+        )
+    
     def get_inspection_history(self, segment_id=None) -> List[Dict]:
         """Get inspection history"""
         if segment_id:
             return [i for i in self.inspections if i['segment_id'] == segment_id]
         return self.inspections
     
+    @cached_property
+    def _pending_alerts(self) -> List[Dict]:
+        """Unacknowledged alerts, computed on first use"""
+        return [a for a in self.alerts if not a['acknowledged']]
+    
     def get_pending_alerts(self) -> List[Dict]:
         """Get pending alerts"""
-        return [a for a in self.alerts if not a['acknowledged']]
+        # A fresh list, so callers cannot alter the cached one
+        return list(self._pending_alerts)
     
     def get_corrosion_trends(self, segment_id: int, days: int = 365) -> Dict:
         """Get corrosion trends for analytics"""
         # Filter inspections for the segment and time period
         cutoff_date = datetime.now() - timedelta(days=days)
-        segment_inspections = [
-            i for i in self.inspections 
-            if i['segment_id'] == segment_id and i['inspection_date'] >= cutoff_date
+        inspections = self.inspections_df
+        segment_inspections = inspections[
+            (inspections['segment_id'] == segment_id) & (inspections['inspection_date'] >= cutoff_date)
         ]
         
-        trend_data = {
-            'dates': [],
-            'total_detections': [],
-            'critical_count': [],
-            'high_count': [],
-            'medium_count': [],
-            'low_count': []
-        }
-        
-        for inspection in segment_inspections:
-            trend_data['dates'].append(inspection['inspection_date'].strftime('%Y-%m-%d'))
-            trend_data['total_detections'].append(inspection['total_detections'])
-            
-            # Get severity breakdown for this inspection
-            inspection_detections = [
-                d for d in self.detections 
-                if d['inspection_id'] == inspection['id']
-            ]
-            
-            severity_counts = {'Critical': 0, 'High': 0, 'Medium': 0, 'Low': 0}
-            for detection in inspection_detections:
-                severity_counts[detection['severity']] += 1
-            
-            trend_data['critical_count'].append(severity_counts['Critical'])
-            trend_data['high_count'].append(severity_counts['High'])
-            trend_data['medium_count'].append(severity_counts['Medium'])
-            trend_data['low_count'].append(severity_counts['Low'])
+        severity_counts = self._severity_by_inspection.reindex(segment_inspections['id'], fill_value=0)
         
-        return trend_data
+        return {
+            'dates': segment_inspections['inspection_date'].dt.strftime('%Y-%m-%d').tolist(),
+            'total_detections': segment_inspections['total_detections'].tolist(),
+            'critical_count': severity_counts['Critical'].tolist(),
+            'high_count': severity_counts['High'].tolist(),
+            'medium_count': severity_counts['Medium'].tolist(),
+            'low_count': severity_counts['Low'].tolist()
+        }
+    
+    @cached_property
+    def _monthly_inspection_counts(self) -> Counter:
+        """Inspection counts keyed by (year, month), computed on first use"""
+        return Counter((i['inspection_date'].year, i['inspection_date'].month) for i in self.inspections)
     
     def get_monthly_inspection_count(self) -> int:
         """Get current month inspection count"""
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        return len([
-            i for i in self.inspections 
-            if i['inspection_date'].month == current_month and i['inspection_date'].year == current_year
-        ])
+        now = datetime.now()
+        return self._monthly_inspection_counts[now.year, now.month]
     
     def get_pipeline_segments(self) -> List[Dict]:
         """Get all pipeline segments"""
         return self.pipeline_segments
     
-    def get_detection_summary(self) -> Dict:
-        """Get overall detection summary"""
-        total_detections = len(self.detections)
-        severity_counts = {'Critical': 0, 'High': 0, 'Medium': 0, 'Low': 0}
-        
-        for detection in self.detections:
-            severity_counts[detection['severity']] += 1
+    @cached_property
+    def _detection_summary(self) -> Dict:
+        """Overall detection summary, computed on first use"""
+        detections = self.detections_df
+        total_detections = len(detections)
+        severity_counts = detections['severity'].value_counts()
+        severity_counts = {s: int(severity_counts.get(s, 0)) for s in ('Critical', 'High', 'Medium', 'Low')}
         
-        avg_confidence = np.mean([d['confidence'] for d in self.detections]) if self.detections else 0
+        avg_confidence = detections['confidence'].mean() if total_detections else 0
         
         return {
             'total_detections': total_detections,
             'severity_counts': severity_counts,
             'avg_confidence': avg_confidence,
-            'last_inspection': max(self.inspections, key=lambda x: x['inspection_date'])['inspection_date'] if self.inspections else None
+            # Inspections are kept newest first
+            'last_inspection': self.inspections[0]['inspection_date'] if self.inspections else None
         }
+    
+    def get_detection_summary(self) -> Dict:
+        """Get overall detection summary"""
+        return self._detection_summary
 
 # Global instance for use across the application
 demo_data = DemoDataProvider()
\ No newline at end of file
@@ -2,28 +2,123 @@
 Enhanced report generator with PDF, Excel, and Word document creation
 Generates professional reports that open properly on any PC
 """
-import io
-import base64
+import copy
+import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-import pandas as pd
+from functools import cached_property, lru_cache
+from typing import BinaryIO, Callable, Dict, List, Any, Optional, Tuple
 
-# Document generation libraries
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+# The document libraries (reportlab, openpyxl, python-docx) are imported by the
+# builders that use them, so importing this module does not load all three
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+# Report size above which output is buffered on disk rather than in memory
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
+# Set once the missing-lxml warning has been shown, so it is not repeated on every export
+_lxml_warned = False
+
+# Severity levels, most severe first
+_SEVERITY_ORDER = ('Critical', 'High', 'Medium', 'Low')
+
+# Table headers
+_PDF_FINDINGS_HEADERS = ('ID', 'Location', 'Area (px²)', 'Confidence', 'Severity', 'Risk Level')
+_WORD_FINDINGS_HEADERS = ('ID', 'Location', 'Area (px²)', 'Confidence', 'Severity', 'Risk Assessment')
+
+# Excel findings headers, with column widths sized to the header or the longest expected value
+_EXCEL_FINDINGS_COLUMNS = (
+    ('Detection ID', 14), ('Location X', 12), ('Location Y', 12), ('Width', 8), ('Height', 8),
+    ('Area', 10), ('Confidence', 12), ('Severity', 10), ('Risk Assessment', 49)
+)
+
+# Regulatory compliance content
+_COMPLIANCE_HEADERS = ('Standard', 'Description', 'Status')
+_COMPLIANCE_ROWS = (
+    ('API RP 1130', 'Computational Pipeline Monitoring', 'Compliant'),
+    ('API RP 1175', 'Pipeline Leak Detection Program Management', 'Compliant'),
+    ('49 CFR Part 195', 'Transportation of Hazardous Liquids by Pipeline', 'Compliant'),
+    ('ASME B31.4', 'Pipeline Transportation Systems for Liquids', 'Compliant')
+)
+
+_COMPLIANCE_TEXT_PDF = """
+        This report complies with the following industry standards:<br/>
+        • API RP 1130 - Computational Pipeline Monitoring<br/>
+        • API RP 1175 - Pipeline Leak Detection Program Management<br/>
+        • 49 CFR Part 195 - Transportation of Hazardous Liquids by Pipeline<br/>
+        • ASME B31.4 - Pipeline Transportation Systems for Liquids
+        """
+
+_COMPLIANCE_TEXT_DOCX = """This report complies with the following industry standards:
+        • API RP 1130 - Computational Pipeline Monitoring
+        • API RP 1175 - Pipeline Leak Detection Program Management
+        • 49 CFR Part 195 - Transportation of Hazardous Liquids by Pipeline
+        • ASME B31.4 - Pipeline Transportation Systems for Liquids"""
+
+# Executive summary and recommendations for a clean inspection
+_CLEAN_SUMMARY_PDF = """
+            <b>Pipeline Status:</b> GOOD - No corrosion detected<br/>
+            <b>Total Corrosion Areas Detected:</b> 0<br/>
+            <b>Inspection Result:</b> Clean inspection - pipeline appears in good condition<br/>
+            <b>Immediate Action Required:</b> No
+            """
+
+_CLEAN_SUMMARY_DOCX_RUNS = (
+    ('Pipeline Status: ', True), ('GOOD - No corrosion detected\n', False),
+    ('Inspection Result: ', True), ('Clean inspection - pipeline appears in good condition', False)
+)
+
+_CLEAN_RECOMMENDATIONS = """
+            Based on the clean inspection results, the following recommendations are provided:
+            
+            1. Continue with the current maintenance schedule
+            2. Monitor coating condition during next routine inspection
+            3. Maintain current corrosion protection systems
+            4. Document this clean inspection in maintenance records
+            5. Consider extending inspection intervals if consistently clean results are observed
+            """
+
+# Recommendation text blocks, joined per report according to the severities found
+_RECOMMENDATIONS_INTRO = "Based on the corrosion detection results, the following actions are recommended:\n\n"
+
+_PRIORITY_RECOMMENDATIONS = (
+    ('Critical',
+     "IMMEDIATE ACTIONS (Within 24 hours):\n"
+     "• Deploy emergency inspection team to validate critical findings\n"
+     "• Consider temporary operational restrictions\n"
+     "• Prepare emergency repair materials and equipment\n\n"),
+    ('High',
+     "HIGH PRIORITY ACTIONS (Within 30 days):\n"
+     "• Schedule detailed manual inspection of identified areas\n"
+     "• Plan maintenance downtime for repairs\n"
+     "• Assess coating failure patterns\n\n"),
+    ('Medium',
+     "MEDIUM PRIORITY ACTIONS (Within 90 days):\n"
+     "• Include in next scheduled maintenance window\n"
+     "• Monitor progression with follow-up imaging\n"
+     "• Review environmental factors contributing to corrosion\n\n"),
+)
+
+_GENERAL_RECOMMENDATIONS = (
+    "GENERAL RECOMMENDATIONS:\n"
+    "• Update integrity management program with findings\n"
+    "• Validate AI detections with manual inspection\n"
+    "• Consider increasing inspection frequency for affected areas\n"
+    "• Review and update corrosion protection systems as needed"
+)
+
+@lru_cache(maxsize=None)
+def _action_recommendations(present: Tuple[bool, ...]) -> str:
+    """
+    Join the recommendation blocks for the severities flagged as present.
+    
+    The text depends only on which severities were found, so each
+    combination is built once and shared by the PDF and Word reports.
+    """
+    parts = [_RECOMMENDATIONS_INTRO]
+    parts.extend(block for (_, block), found in zip(_PRIORITY_RECOMMENDATIONS, present) if found)
+    parts.append(_GENERAL_RECOMMENDATIONS)
+    return "".join(parts)
 
 class EnhancedReportGenerator:
     """Enhanced report generator for professional industrial reports"""
@@ -31,30 +126,102 @@ class EnhancedReportGenerator:
     def __init__(self):
         self.company_name = "Pipeline Integrity Solutions"
         self.report_date = datetime.now()
+        
+        # Report date strings, formatted once for every report this generator builds
+        self._report_day = self.report_date.strftime('%Y-%m-%d')
+        self._generated_at = self.report_date.strftime('%Y-%m-%d %H:%M:%S')
+
+    
+    @cached_property
+    def _pdf_styles(self) -> Dict[str, Any]:
+        """PDF paragraph and table styles, shared by every report this generator builds"""
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import TableStyle
+        
+        styles = getSampleStyleSheet()
+        return {
+            'sheet': styles,
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=18,
+                spaceAfter=30,
+                alignment=TA_CENTER,
+                textColor=colors.darkblue
+            ),
+            'heading': ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceAfter=12,
+                textColor=colors.darkblue
+            ),
+            'details_table': TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]),
+            'findings_table': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ])
+        }
+    
+    @cached_property
+    def _compliance_paragraph(self):
+        """
+        The static compliance paragraph, with its markup parsed once.
+        
+        Building a document lays out the flowables it is given, so each
+        report appends a shallow copy that shares the parsed fragments.
+        """
+        from reportlab.platypus import Paragraph
+        
+        return Paragraph(_COMPLIANCE_TEXT_PDF, self._pdf_styles['sheet']['Normal'])
+    
+    @cached_property
+    def _excel_styles(self) -> Dict[str, Any]:
+        """Excel cell styles, shared so openpyxl registers each once per workbook"""
+        from openpyxl.styles import Alignment, Font, PatternFill
+        
+        return {
+            'title_font': Font(size=16, bold=True, color='1F4E79'),
+            'section_font': Font(size=14, bold=True, color='1F4E79'),
+            'bold_font': Font(bold=True),
+            'header_font': Font(bold=True, color='FFFFFF'),
+            'header_fill': PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid'),
+            'centered': Alignment(horizontal='center')
+        }
     
     def generate_pdf_report(self, data: Dict[str, Any]) -> bytes:
         """Generate professional PDF report"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch)
+        total_detections = data.get('total_detections', 0)
+        avg_confidence = data.get('avg_confidence', 0)
+        severity_counts = data.get('severity_counts', {})
+        detections = data.get('detections', [])
         
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
         
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.darkblue
-        )
+        # Get styles
+        pdf_styles = self._pdf_styles
+        styles = pdf_styles['sheet']
+        title_style = pdf_styles['title']
+        heading_style = pdf_styles['heading']
         
         # Build document content
         content = []
@@ -70,21 +237,13 @@ class EnhancedReportGenerator:
             ['Report Type:', data.get('report_type', 'Standard Analysis')],
             ['Inspector:', data.get('inspector_name', 'Field Engineer')],
             ['Location:', data.get('location', 'Pipeline Section')],
-            ['Inspection Date:', data.get('inspection_date', self.report_date.strftime('%Y-%m-%d'))],
+            ['Inspection Date:', data.get('inspection_date', self._report_day)],
             ['Pipeline Type:', data.get('pipeline_type', 'Unknown')],
-            ['Generated:', self.report_date.strftime('%Y-%m-%d %H:%M:%S')]
+            ['Generated:', self._generated_at]
         ]
         
         details_table = Table(report_details, colWidths=[2*inch, 4*inch])
-        details_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        details_table.setStyle(pdf_styles['details_table'])
         
         content.append(details_table)
         content.append(Spacer(1, 0.3*inch))
@@ -92,11 +251,7 @@ class EnhancedReportGenerator:
         # Executive Summary
         content.append(Paragraph("EXECUTIVE SUMMARY", heading_style))
         
-        total_detections = data.get('total_detections', 0)
-        avg_confidence = data.get('avg_confidence', 0)
-        
         if total_detections > 0:
-            severity_counts = data.get('severity_counts', {})
             max_severity = self._get_max_severity(severity_counts)
             
             summary_text = f"""
@@ -107,12 +262,7 @@ class EnhancedReportGenerator:
             <b>Immediate Action Required:</b> {'Yes' if max_severity in ['Critical', 'High'] else 'No'}
             """
         else:
-            summary_text = """
-            <b>Pipeline Status:</b> GOOD - No corrosion detected<br/>
-            <b>Total Corrosion Areas Detected:</b> 0<br/>
-            <b>Inspection Result:</b> Clean inspection - pipeline appears in good condition<br/>
-            <b>Immediate Action Required:</b> No
-            """
+            summary_text = _CLEAN_SUMMARY_PDF
         
         content.append(Paragraph(summary_text, styles['Normal']))
         content.append(Spacer(1, 0.2*inch))
@@ -122,31 +272,18 @@ class EnhancedReportGenerator:
             content.append(Paragraph("DETAILED FINDINGS", heading_style))
             
             # Create detection table
-            detection_data = [['ID', 'Location', 'Area (px²)', 'Confidence', 'Severity', 'Risk Level']]
-            
-            detections = data.get('detections', [])
-            for i, detection in enumerate(detections[:10]):  # Limit to 10 for PDF
-                detection_data.append([
-                    f"C{detection.get('id', i+1):03d}",
-                    f"({detection['bbox'][0]}, {detection['bbox'][1]})",
-                    str(detection['area']),
-                    f"{detection['confidence']:.1%}",
-                    detection['severity'],
-                    detection['risk_assessment']
-                ])
+            detection_data = [list(_PDF_FINDINGS_HEADERS)]
+            detection_data.extend([
+                f"C{detection.get('id', i+1):03d}",
+                f"({detection['bbox'][0]}, {detection['bbox'][1]})",
+                str(detection['area']),
+                f"{detection['confidence']:.1%}",
+                detection['severity'],
+                detection['risk_assessment']
+            ] for i, detection in enumerate(detections[:10]))  # Limit to 10 for PDF
             
             findings_table = Table(detection_data, colWidths=[0.8*inch, 1.2*inch, 1*inch, 1*inch, 1*inch, 2*inch])
-            findings_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
+            findings_table.setStyle(pdf_styles['findings_table'])
             
             content.append(findings_table)
             content.append(Spacer(1, 0.2*inch))
@@ -159,34 +296,34 @@ class EnhancedReportGenerator:
         # Compliance section
         content.append(Spacer(1, 0.2*inch))
         content.append(Paragraph("REGULATORY COMPLIANCE", heading_style))
-        compliance_text = """
-        This report complies with the following industry standards:<br/>
-        • API RP 1130 - Computational Pipeline Monitoring<br/>
-        • API RP 1175 - Pipeline Leak Detection Program Management<br/>
-        • 49 CFR Part 195 - Transportation of Hazardous Liquids by Pipeline<br/>
-        • ASME B31.4 - Pipeline Transportation Systems for Liquids
-        """
-        content.append(Paragraph(compliance_text, styles['Normal']))
+        content.append(copy.copy(self._compliance_paragraph))
         
         # Footer
         content.append(Spacer(1, 0.3*inch))
         footer_text = f"""
         <i>Report generated by AI-Powered Pipeline Corrosion Detection System<br/>
-        {self.company_name} | Generated: {self.report_date.strftime('%Y-%m-%d %H:%M:%S')}</i>
+        {self.company_name} | Generated: {self._generated_at}</i>
         """
         content.append(Paragraph(footer_text, styles['Normal']))
         
         # Build PDF
-        doc.build(content)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return self._render(
+            lambda buffer: SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch).build(content)
+        )
     
     def generate_excel_report(self, data: Dict[str, Any]) -> bytes:
         """Generate Excel report with multiple sheets"""
-        wb = Workbook()
+        global _lxml_warned
+        from openpyxl import Workbook
+        from openpyxl.xml import LXML
         
-        # Remove default sheet
-        wb.remove(wb.active)
+        # openpyxl streams worksheet XML through lxml when it is available
+        if not LXML and not _lxml_warned:
+            _lxml_warned = True
+            warnings.warn("lxml is not installed; install it for faster Excel export")
+        
+        # Write-only workbooks stream rows to the file instead of keeping every cell in memory
+        wb = Workbook(write_only=True)
         
         # Create Summary sheet
         summary_sheet = wb.create_sheet("Executive Summary")
@@ -202,13 +339,19 @@ class EnhancedReportGenerator:
         self._create_excel_compliance(compliance_sheet, data)
         
         # Save to buffer
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return self._render(wb.save)
     
     def generate_word_report(self, data: Dict[str, Any]) -> bytes:
         """Generate Word document report"""
+        total_detections = data.get('total_detections', 0)
+        avg_confidence = data.get('avg_confidence', 0)
+        severity_counts = data.get('severity_counts', {})
+        detections = data.get('detections', [])
+        
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Pt
+        
         doc = Document()
         
         # Title
@@ -231,43 +374,34 @@ class EnhancedReportGenerator:
             ('Report Type:', data.get('report_type', 'Standard Analysis')),
             ('Inspector:', data.get('inspector_name', 'Field Engineer')),
             ('Location:', data.get('location', 'Pipeline Section')),
-            ('Inspection Date:', data.get('inspection_date', self.report_date.strftime('%Y-%m-%d'))),
+            ('Inspection Date:', data.get('inspection_date', self._report_day)),
             ('Pipeline Type:', data.get('pipeline_type', 'Unknown')),
-            ('Generated:', self.report_date.strftime('%Y-%m-%d %H:%M:%S'))
+            ('Generated:', self._generated_at)
         ]
         
-        for i, (label, value) in enumerate(info_data):
-            info_table.cell(i, 0).text = label
-            info_table.cell(i, 1).text = str(value)
-            info_table.cell(i, 0).paragraphs[0].runs[0].font.bold = True
+        for row, (label, value) in zip(info_table.rows, info_data):
+            label_cell, value_cell = row.cells
+            label_cell.text = label
+            value_cell.text = str(value)
+            label_cell.paragraphs[0].runs[0].font.bold = True
         
         doc.add_paragraph()
         
         # Executive Summary
         doc.add_heading('Executive Summary', level=1)
         
-        total_detections = data.get('total_detections', 0)
-        avg_confidence = data.get('avg_confidence', 0)
-        
         if total_detections > 0:
-            severity_counts = data.get('severity_counts', {})
             max_severity = self._get_max_severity(severity_counts)
             
-            summary_para = doc.add_paragraph()
-            summary_para.add_run('Pipeline Status: ').bold = True
-            summary_para.add_run(f'{self._get_status_description(max_severity)}\n')
-            summary_para.add_run('Total Detections: ').bold = True
-            summary_para.add_run(f'{total_detections}\n')
-            summary_para.add_run('Average Confidence: ').bold = True
-            summary_para.add_run(f'{avg_confidence:.1%}\n')
-            summary_para.add_run('Maximum Severity: ').bold = True
-            summary_para.add_run(f'{max_severity}\n')
+            summary_runs = (
+                ('Pipeline Status: ', True), (f'{self._get_status_description(max_severity)}\n', False),
+                ('Total Detections: ', True), (f'{total_detections}\n', False),
+                ('Average Confidence: ', True), (f'{avg_confidence:.1%}\n', False),
+                ('Maximum Severity: ', True), (f'{max_severity}\n', False)
+            )
         else:
-            summary_para = doc.add_paragraph()
-            summary_para.add_run('Pipeline Status: ').bold = True
-            summary_para.add_run('GOOD - No corrosion detected\n')
-            summary_para.add_run('Inspection Result: ').bold = True
-            summary_para.add_run('Clean inspection - pipeline appears in good condition')
+            summary_runs = _CLEAN_SUMMARY_DOCX_RUNS
+        self._add_runs(doc.add_paragraph(), summary_runs)
         
         # Detailed Findings
         if total_detections > 0:
@@ -277,22 +411,21 @@ class EnhancedReportGenerator:
             findings_table.style = 'Table Grid'
             
             # Header row
-            headers = ['ID', 'Location', 'Area (px²)', 'Confidence', 'Severity', 'Risk Assessment']
-            for i, header in enumerate(headers):
+            for i, header in enumerate(_WORD_FINDINGS_HEADERS):
                 cell = findings_table.cell(0, i)
                 cell.text = header
                 cell.paragraphs[0].runs[0].font.bold = True
             
             # Data rows
-            detections = data.get('detections', [])
             for detection in detections:
-                row = findings_table.add_row()
-                row.cells[0].text = f"C{detection.get('id', 1):03d}"
-                row.cells[1].text = f"({detection['bbox'][0]}, {detection['bbox'][1]})"
-                row.cells[2].text = str(detection['area'])
-                row.cells[3].text = f"{detection['confidence']:.1%}"
-                row.cells[4].text = detection['severity']
-                row.cells[5].text = detection['risk_assessment']
+                # Row.cells rebuilds its cell list on every access, so fetch it once
+                cells = findings_table.add_row().cells
+                cells[0].text = f"C{detection.get('id', 1):03d}"
+                cells[1].text = f"({detection['bbox'][0]}, {detection['bbox'][1]})"
+                cells[2].text = str(detection['area'])
+                cells[3].text = f"{detection['confidence']:.1%}"
+                cells[4].text = detection['severity']
+                cells[5].text = detection['risk_assessment']
         
         # Recommendations
         doc.add_heading('Recommendations', level=1)
@@ -301,125 +434,148 @@ class EnhancedReportGenerator:
         
         # Compliance
         doc.add_heading('Regulatory Compliance', level=1)
-        compliance_text = """This report complies with the following industry standards:
-        • API RP 1130 - Computational Pipeline Monitoring
-        • API RP 1175 - Pipeline Leak Detection Program Management
-        • 49 CFR Part 195 - Transportation of Hazardous Liquids by Pipeline
-        • ASME B31.4 - Pipeline Transportation Systems for Liquids"""
-        doc.add_paragraph(compliance_text)
+        doc.add_paragraph(_COMPLIANCE_TEXT_DOCX)
         
         # Save to buffer
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return self._render(doc.save)
+    
+    def _add_runs(self, paragraph, runs: Tuple[Tuple[str, bool], ...]):
+        """Add (text, bold) runs to a Word paragraph"""
+        for text, bold in runs:
+            run = paragraph.add_run(text)
+            if bold:
+                run.bold = True
+    
+    def generate_all(self, data: Dict[str, Any]) -> Dict[str, bytes]:
+        """
+        Generate the PDF, Excel and Word reports concurrently.
+        
+        Returns:
+            Report bytes keyed by 'pdf', 'excel' and 'word'
+        """
+        # The builders share only read-only styles and text, so they can run side by side
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'pdf': executor.submit(self.generate_pdf_report, data),
+                'excel': executor.submit(self.generate_excel_report, data),
+                'word': executor.submit(self.generate_word_report, data)
+            }
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _render(self, save: Callable[[BinaryIO], None]) -> bytes:
+        """
+        Write a document with save(buffer) and return its bytes.
+        
+        The buffer stays in memory up to _SPOOL_MAX_SIZE and rolls over to
+        a temporary file beyond that, so large reports are not held twice.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as buffer:
+            save(buffer)
+            buffer.seek(0)
+            return buffer.read()
+    
+    def _styled_cell(self, sheet, value, font, fill=None):
+        """Create a styled cell for a write-only sheet"""
+        from openpyxl.cell import WriteOnlyCell
+        
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        return cell
+    
+    def _percent_cell(self, sheet, value: float):
+        """Create a cell holding a fraction, displayed as a percentage"""
+        from openpyxl.cell import WriteOnlyCell
+        
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.number_format = '0.0%'
+        return cell
     
     def _create_excel_summary(self, sheet, data):
         """Create Excel summary sheet"""
+        styles = self._excel_styles
+        
         # Title
-        sheet['A1'] = 'PIPELINE CORROSION DETECTION REPORT'
-        sheet['A1'].font = Font(size=16, bold=True, color='1F4E79')
-        sheet.merge_cells('A1:F1')
-        sheet['A1'].alignment = Alignment(horizontal='center')
+        title = self._styled_cell(sheet, 'PIPELINE CORROSION DETECTION REPORT', styles['title_font'])
+        title.alignment = styles['centered']
+        sheet.merged_cells.add('A1:F1')
+        sheet.append([title])
+        sheet.append([])
         
         # Report details
         details = [
             ['Report Type:', data.get('report_type', 'Standard Analysis')],
             ['Inspector:', data.get('inspector_name', 'Field Engineer')],
             ['Location:', data.get('location', 'Pipeline Section')],
-            ['Date:', data.get('inspection_date', self.report_date.strftime('%Y-%m-%d'))],
+            ['Date:', data.get('inspection_date', self._report_day)],
             ['Pipeline Type:', data.get('pipeline_type', 'Unknown')]
         ]
         
-        for i, (label, value) in enumerate(details, start=3):
-            sheet[f'A{i}'] = label
-            sheet[f'B{i}'] = value
-            sheet[f'A{i}'].font = Font(bold=True)
+        for label, value in details:
+            sheet.append([self._styled_cell(sheet, label, styles['bold_font']), value])
         
         # Summary metrics
-        start_row = len(details) + 5
-        sheet[f'A{start_row}'] = 'SUMMARY METRICS'
-        sheet[f'A{start_row}'].font = Font(size=14, bold=True, color='1F4E79')
+        sheet.append([])
+        sheet.append([])
+        sheet.append([self._styled_cell(sheet, 'SUMMARY METRICS', styles['section_font'])])
+        sheet.append([])
         
         metrics = [
             ['Total Detections:', data.get('total_detections', 0)],
-            ['Average Confidence:', f"{data.get('avg_confidence', 0):.1%}"],
+            ['Average Confidence:', self._percent_cell(sheet, data.get('avg_confidence', 0))],
             ['Maximum Severity:', self._get_max_severity(data.get('severity_counts', {}))]
         ]
         
-        for i, (label, value) in enumerate(metrics, start=start_row+2):
-            sheet[f'A{i}'] = label
-            sheet[f'B{i}'] = value
-            sheet[f'A{i}'].font = Font(bold=True)
+        for label, value in metrics:
+            sheet.append([self._styled_cell(sheet, label, styles['bold_font']), value])
     
     def _create_excel_findings(self, sheet, data):
         """Create Excel detailed findings sheet"""
-        # Headers
-        headers = ['Detection ID', 'Location X', 'Location Y', 'Width', 'Height', 'Area', 'Confidence', 'Severity', 'Risk Assessment']
+        from openpyxl.utils import get_column_letter
+        
+        styles = self._excel_styles
         
-        for i, header in enumerate(headers, start=1):
-            cell = sheet.cell(row=1, column=i)
-            cell.value = header
-            cell.font = Font(bold=True, color='FFFFFF')
-            cell.fill = PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid')
+        # Column widths must be set before any row is streamed
+        for col_idx, (_, width) in enumerate(_EXCEL_FINDINGS_COLUMNS, start=1):
+            sheet.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        # Headers
+        sheet.append([self._styled_cell(sheet, header, styles['header_font'], styles['header_fill']) for header, _ in _EXCEL_FINDINGS_COLUMNS])
         
         # Data
         detections = data.get('detections', [])
-        for row_idx, detection in enumerate(detections, start=2):
-            sheet.cell(row=row_idx, column=1).value = f"C{detection.get('id', row_idx-1):03d}"
-            sheet.cell(row=row_idx, column=2).value = detection['bbox'][0]
-            sheet.cell(row=row_idx, column=3).value = detection['bbox'][1]
-            sheet.cell(row=row_idx, column=4).value = detection['bbox'][2]
-            sheet.cell(row=row_idx, column=5).value = detection['bbox'][3]
-            sheet.cell(row=row_idx, column=6).value = detection['area']
-            sheet.cell(row=row_idx, column=7).value = f"{detection['confidence']:.1%}"
-            sheet.cell(row=row_idx, column=8).value = detection['severity']
-            sheet.cell(row=row_idx, column=9).value = detection['risk_assessment']
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column = [cell for cell in column]
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            sheet.column_dimensions[column[0].column_letter].width = adjusted_width
+        for row_idx, detection in enumerate(detections, start=1):
+            sheet.append([
+                f"C{detection.get('id', row_idx):03d}",
+                detection['bbox'][0],
+                detection['bbox'][1],
+                detection['bbox'][2],
+                detection['bbox'][3],
+                detection['area'],
+                self._percent_cell(sheet, detection['confidence']),
+                detection['severity'],
+                detection['risk_assessment']
+            ])
     
     def _create_excel_compliance(self, sheet, data):
         """Create Excel compliance sheet"""
-        sheet['A1'] = 'REGULATORY COMPLIANCE REPORT'
-        sheet['A1'].font = Font(size=16, bold=True, color='1F4E79')
-        
-        compliance_info = [
-            ['Standard', 'Description', 'Status'],
-            ['API RP 1130', 'Computational Pipeline Monitoring', 'Compliant'],
-            ['API RP 1175', 'Pipeline Leak Detection Program Management', 'Compliant'],
-            ['49 CFR Part 195', 'Transportation of Hazardous Liquids by Pipeline', 'Compliant'],
-            ['ASME B31.4', 'Pipeline Transportation Systems for Liquids', 'Compliant']
-        ]
+        styles = self._excel_styles
+        
+        sheet.append([self._styled_cell(sheet, 'REGULATORY COMPLIANCE REPORT', styles['title_font'])])
+        sheet.append([])
         
-        for row_idx, row_data in enumerate(compliance_info, start=3):
-            for col_idx, value in enumerate(row_data, start=1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                cell.value = value
-                if row_idx == 3:  # Header row
-                    cell.font = Font(bold=True, color='FFFFFF')
-                    cell.fill = PatternFill(start_color='1F4E79', end_color='1F4E79', fill_type='solid')
+        # Header row
+        sheet.append([self._styled_cell(sheet, value, styles['header_font'], styles['header_fill']) for value in _COMPLIANCE_HEADERS])
+        for row_data in _COMPLIANCE_ROWS:
+            sheet.append(row_data)
     
     def _get_max_severity(self, severity_counts):
         """Get maximum severity level"""
         if not severity_counts:
             return "None"
         
-        severity_order = ['Critical', 'High', 'Medium', 'Low']
-        for severity in severity_order:
-            if severity_counts.get(severity, 0) > 0:
-                return severity
-        return "None"
+        return next((s for s in _SEVERITY_ORDER if severity_counts.get(s, 0) > 0), "None")
     
     def _get_status_description(self, max_severity):
         """Get status description based on severity"""
@@ -437,44 +593,12 @@ class EnhancedReportGenerator:
         total_detections = data.get('total_detections', 0)
         
         if total_detections == 0:
-            return """
-            Based on the clean inspection results, the following recommendations are provided:
-            
-            1. Continue with the current maintenance schedule
-            2. Monitor coating condition during next routine inspection
-            3. Maintain current corrosion protection systems
-            4. Document this clean inspection in maintenance records
-            5. Consider extending inspection intervals if consistently clean results are observed
-            """
+            return _CLEAN_RECOMMENDATIONS
         
         severity_counts = data.get('severity_counts', {})
-        recommendations = "Based on the corrosion detection results, the following actions are recommended:\n\n"
-        
-        if severity_counts.get('Critical', 0) > 0:
-            recommendations += "IMMEDIATE ACTIONS (Within 24 hours):\n"
-            recommendations += "• Deploy emergency inspection team to validate critical findings\n"
-            recommendations += "• Consider temporary operational restrictions\n"
-            recommendations += "• Prepare emergency repair materials and equipment\n\n"
-        
-        if severity_counts.get('High', 0) > 0:
-            recommendations += "HIGH PRIORITY ACTIONS (Within 30 days):\n"
-            recommendations += "• Schedule detailed manual inspection of identified areas\n"
-            recommendations += "• Plan maintenance downtime for repairs\n"
-            recommendations += "• Assess coating failure patterns\n\n"
-        
-        if severity_counts.get('Medium', 0) > 0:
-            recommendations += "MEDIUM PRIORITY ACTIONS (Within 90 days):\n"
-            recommendations += "• Include in next scheduled maintenance window\n"
-            recommendations += "• Monitor progression with follow-up imaging\n"
-            recommendations += "• Review environmental factors contributing to corrosion\n\n"
-        
-        recommendations += "GENERAL RECOMMENDATIONS:\n"
-        recommendations += "• Update integrity management program with findings\n"
-        recommendations += "• Validate AI detections with manual inspection\n"
-        recommendations += "• Consider increasing inspection frequency for affected areas\n"
-        recommendations += "• Review and update corrosion protection systems as needed"
-        
-        return recommendations
+        return _action_recommendations(tuple(
+            severity_counts.get(severity, 0) > 0 for severity, _ in _PRIORITY_RECOMMENDATIONS
+        ))
 
 # Global instance
 enhanced_report_generator = EnhancedReportGenerator()
\ No newline at end of file
@@ -3,21 +3,42 @@ import cv2
 import numpy as np
 from PIL import Image
 import pandas as pd
-import matplotlib.pyplot as plt
-import io
-import base64
+import hashlib
+from collections import Counter
 from datetime import datetime
-import os
+from typing import Optional
 
 from corrosion_detector import CorrosionDetector
-from report_generator import ReportGenerator
 from enhanced_report_generator import enhanced_report_generator
-from utils import ImageProcessor, format_confidence
 from analytics_dashboard import AnalyticsDashboard
 from database import DatabaseManager, init_database
 import plotly.graph_objects as go
 import plotly.express as px
 
+# Longest side, in pixels, of images shown in the page columns
+PREVIEW_SIZE = 700
+
+# Largest upload, in pixels, accepted for analysis
+MAX_PIXELS = 50_000_000
+IMAGE_TOO_LARGE_MESSAGE = f"Image too large (> {MAX_PIXELS // 1_000_000} MP). Please downsize before upload."
+
+UNREADABLE_IMAGE_MESSAGE = "Could not decode the uploaded image. The file may be corrupt or truncated."
+
+SEVERITY_RANK = {'Low': 0, 'Medium': 1, 'High': 2, 'Critical': 3}
+
+# Sample RUL data
+RUL_SEGMENTS = ['Segment A', 'Segment B', 'Segment C', 'Segment D']
+RUL_REMAINING_LIFE = [2.5, 8.2, 5.7, 12.1]  # years
+RUL_CONFIDENCE = [0.85, 0.92, 0.78, 0.88]
+
+# Sample user table
+SAMPLE_USERS = {
+    'Username': ['john.doe', 'jane.smith', 'mike.wilson'],
+    'Role': ['Administrator', 'Inspector', 'Analyst'],
+    'Last Login': ['2025-06-30', '2025-06-29', '2025-06-28'],
+    'Status': ['Active', 'Active', 'Active']
+}
+
 # Configure page
 st.set_page_config(
     page_title="Industrial Pipeline Corrosion Management System",
@@ -36,17 +57,114 @@ def get_database_manager():
 def get_analytics_dashboard():
     return AnalyticsDashboard()
 
+# Reuse detectors across reruns for identical settings
+@st.cache_resource
+def get_detector(sensitivity: float, min_area: int, pipeline_type: str):
+    return CorrosionDetector(
+        sensitivity=sensitivity,
+        min_area=min_area,
+        pipeline_type=pipeline_type
+    )
+
+# Cached functions take the upload's content hash as their key and skip hashing
+# the raw bytes themselves (underscore-prefixed arguments are not hashed)
+def _upload_key(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _decode_image(data: bytes) -> Optional[np.ndarray]:
+    # Decode straight to BGR, the layout the detector works in; None if undecodable.
+    # Not cached itself: only _run_detection calls it, and that is cached on the same key.
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+# Rerunning with an unchanged upload and settings returns the cached results
+@st.cache_data(max_entries=16, show_spinner=False)
+def _run_detection(upload_key: str, _data: bytes, sensitivity: float, min_area: int,
+                   pipeline_type: str) -> Optional[dict]:
+    image = _decode_image(_data)
+    # Bytes that pass the header check can still fail to decode (e.g. a truncated body)
+    if image is None:
+        return None
+    detector = get_detector(sensitivity, min_area, pipeline_type)
+    return detector.detect_corrosion(image)
+
+# Figures depend only on their inputs, so reruns reuse the built figure.
+# They are held as shared resources, like the dashboard's figure builders, so a
+# rerun does not pickle and unpickle them; callers only pass them to st.plotly_chart.
+@st.cache_resource
+def _severity_figure(severity_counts: tuple) -> go.Figure:
+    severity_data = pd.DataFrame(severity_counts, columns=['Severity', 'Count'])
+    fig = px.bar(severity_data, x='Severity', y='Count',
+               color='Severity',
+               color_discrete_map={
+                   'Critical': '#d62728',
+                   'High': '#ff7f0e', 
+                   'Medium': '#ffbb78',
+                   'Low': '#2ca02c'
+               })
+    fig.update_layout(showlegend=False, height=300)
+    return fig
+
+@st.cache_resource
+def _trend_figures() -> tuple:
+    # Sample trend data, seeded so the charts stay put across reruns
+    rng = np.random.default_rng(42)
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='ME')
+    corrosion_rate = rng.normal(15, 3, len(dates))
+    detection_count = rng.poisson(12, len(dates))
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=corrosion_rate, mode='lines+markers', 
+                           name='Corrosion Rate (mm/year)', line=dict(color='red')))
+    fig.update_layout(title="Corrosion Rate Trend", xaxis_title="Date", yaxis_title="Rate (mm/year)")
+    
+    fig2 = go.Figure()
+    fig2.add_trace(go.Bar(x=dates, y=detection_count, name='Monthly Detections'))
+    fig2.update_layout(title="Detection Frequency", xaxis_title="Date", yaxis_title="Count")
+    return fig, fig2
+
+@st.cache_resource
+def _failure_probability_figure() -> go.Figure:
+    time_horizon = np.arange(1, 11)  # 1-10 years
+    failure_prob = 1 - np.exp(-0.1 * time_horizon)  # Exponential failure model
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=time_horizon, y=failure_prob*100, mode='lines+markers',
+                           name='Failure Probability', line=dict(color='red')))
+    fig.update_layout(title="Failure Probability Over Time", 
+                     xaxis_title="Years", yaxis_title="Probability (%)")
+    return fig
+
+@st.cache_data
+def _rul_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Segment': RUL_SEGMENTS,
+        'Remaining Life (Years)': RUL_REMAINING_LIFE,
+        'Confidence': RUL_CONFIDENCE
+    })
+
+@st.cache_data
+def _users_df() -> pd.DataFrame:
+    return pd.DataFrame(SAMPLE_USERS)
+
+# Pay OpenCV's lazy initialization once per process, not on the first detection
+@st.cache_resource
+def _warmup():
+    CorrosionDetector().detect_corrosion(np.zeros((64, 64, 3), dtype=np.uint8))
+    return True
+
 # Initialize session state
 if 'detection_results' not in st.session_state:
     st.session_state.detection_results = None
-if 'processed_image' not in st.session_state:
-    st.session_state.processed_image = None
+if 'processed_png' not in st.session_state:
+    st.session_state.processed_png = None
 if 'original_image' not in st.session_state:
     st.session_state.original_image = None
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Detection"
 
 def main():
+    _warmup()
+    
     # Header
     st.title("🏭 Industrial Pipeline Corrosion Management System")
     st.markdown("### AI-Powered Pipeline Integrity & Maintenance Planning")
@@ -72,8 +190,8 @@ def main():
 def render_detection_page():
     """Enhanced detection page with industrial features"""
     
-    # Sidebar configuration
-    with st.sidebar:
+    # Sidebar configuration; edits apply together on submit instead of rerunning per widget
+    with st.sidebar, st.form("detection_settings", border=False):
         st.header("🔧 Detection Configuration")
         
         # Pipeline segment selection
@@ -121,6 +239,8 @@ def render_detection_page():
         inspection_method = st.selectbox("Inspection Method", 
                                        ["AI Vision", "Smart Pig", "Manual", "Combined"])
         certification = st.text_input("Certification", value="API 571")
+        
+        st.form_submit_button("Apply Settings", use_container_width=True)
     
     # Main detection interface
     col1, col2 = st.columns([1, 1])
@@ -136,7 +256,32 @@ def render_detection_page():
         
         if uploaded_file is not None:
             # Display image with metadata
-            image = Image.open(uploaded_file)
+            # Opening only parses the header, so oversized images are rejected before decoding
+            try:
+                image = Image.open(uploaded_file)
+            except Image.DecompressionBombError:
+                # PIL refuses headers far beyond its own pixel limit before we can check the size
+                st.error(IMAGE_TOO_LARGE_MESSAGE)
+                st.stop()
+            except OSError:
+                st.error(UNREADABLE_IMAGE_MESSAGE)
+                st.stop()
+            width, height = image.size
+            if width * height > MAX_PIXELS:
+                st.error(IMAGE_TOO_LARGE_MESSAGE)
+                st.stop()
+            
+            # Read and hash the upload once; the hash keys every cached step downstream
+            upload_bytes = uploaded_file.getvalue()
+            upload_key = _upload_key(upload_bytes)
+            
+            # The preview column is narrow; shrink before display (JPEGs decode at a
+            # reduced scale via draft). Detection decodes the full-resolution bytes separately.
+            try:
+                image.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.Resampling.BOX)
+            except OSError:
+                st.error(UNREADABLE_IMAGE_MESSAGE)
+                st.stop()
             st.session_state.original_image = image
             
             st.subheader("Original Image")
@@ -145,59 +290,50 @@ def render_detection_page():
             # Enhanced image metadata
             col_meta1, col_meta2 = st.columns(2)
             with col_meta1:
-                st.markdown("**Image Properties:**")
-                st.write(f"📐 Size: {image.size[0]} × {image.size[1]} pixels")
-                st.write(f"📁 Format: {image.format}")
-                st.write(f"🎨 Mode: {image.mode}")
-                st.write(f"📦 File Size: {uploaded_file.size / 1024:.1f} KB")
+                st.markdown(
+                    "**Image Properties:**  \n"
+                    f"📐 Size: {width} × {height} pixels  \n"
+                    f"📁 Format: {image.format}  \n"
+                    f"🎨 Mode: {image.mode}  \n"
+                    f"📦 File Size: {uploaded_file.size / 1024:.1f} KB"
+                )
             
             with col_meta2:
-                st.markdown("**Analysis Parameters:**")
-                st.write(f"🔍 Sensitivity: {sensitivity}")
-                st.write(f"📏 Min Area: {min_area} px²")
-                st.write(f"🌊 Environment: {pipeline_type}")
-                st.write(f"⚙️ Method: {inspection_method}")
+                st.markdown(
+                    "**Analysis Parameters:**  \n"
+                    f"🔍 Sensitivity: {sensitivity}  \n"
+                    f"📏 Min Area: {min_area} px²  \n"
+                    f"🌊 Environment: {pipeline_type}  \n"
+                    f"⚙️ Method: {inspection_method}"
+                )
             
-            # Analysis button with progress
+            # Analysis button with status
             if st.button("🚀 Run AI Analysis", type="primary", use_container_width=True):
                 
-                # Progress bar and status
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                with st.spinner("Running comprehensive corrosion analysis..."):
-                    # Initialize detector
-                    status_text.text("Initializing AI detection engine...")
-                    progress_bar.progress(20)
-                    
-                    detector = CorrosionDetector(
-                        sensitivity=sensitivity,
-                        min_area=min_area,
-                        pipeline_type=pipeline_type.lower()
-                    )
-                    
-                    # Convert and preprocess image
-                    status_text.text("Preprocessing image...")
-                    progress_bar.progress(40)
-                    
-                    opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                    
+                with st.status("Running comprehensive corrosion analysis...", expanded=False) as status:
                     # Run detection
-                    status_text.text("Analyzing corrosion patterns...")
-                    progress_bar.progress(70)
-                    
-                    results = detector.detect_corrosion(opencv_image)
+                    results = _run_detection(
+                        upload_key,
+                        upload_bytes,
+                        sensitivity,
+                        min_area,
+                        pipeline_type.lower()
+                    )
+                    if results is None:
+                        status.update(label="❌ Analysis failed", state="error")
+                        st.error(UNREADABLE_IMAGE_MESSAGE)
+                        st.stop()
                     
                     # Store results
-                    status_text.text("Processing results...")
-                    progress_bar.progress(90)
-                    
                     st.session_state.detection_results = results
-                    st.session_state.processed_image = results['annotated_image']
-                    
-                    # Save to database (simulate)
-                    status_text.text("Saving inspection record...")
-                    progress_bar.progress(100)
+                    # Encode once; reruns serve the PNG bytes as is
+                    annotated = results['annotated_image']
+                    preview_scale = PREVIEW_SIZE / max(annotated.shape[:2])
+                    if preview_scale < 1.0:
+                        annotated = cv2.resize(annotated, None, fx=preview_scale, fy=preview_scale,
+                                               interpolation=cv2.INTER_AREA)
+                    _, png = cv2.imencode('.png', annotated, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+                    st.session_state.processed_png = png.tobytes()
                     
                     # Store inspection data
                     inspection_data = {
@@ -216,98 +352,76 @@ def render_detection_page():
                         }
                     }
                     
-                status_text.text("✅ Analysis complete!")
-                st.success("Corrosion analysis completed successfully!")
-                st.rerun()
+                    status.update(label="✅ Analysis complete!", state="complete")
     
+    
+    # Rendered after the upload column, so a fresh analysis shows in this same pass
     with col2:
-        st.header("🎯 Analysis Results")
+        render_detection_results()
+
+def render_detection_results():
+    """Render the latest detection results"""
+    st.header("🎯 Analysis Results")
+    
+    if st.session_state.detection_results is not None:
+        results = st.session_state.detection_results
         
-        if st.session_state.detection_results is not None:
-            results = st.session_state.detection_results
-            
-            # Display annotated image
-            st.subheader("🔍 Detected Corrosion Areas")
-            processed_image_rgb = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2RGB)
-            st.image(processed_image_rgb, caption="AI Detection Results", use_container_width=True)
-            
-            # Enhanced metrics display
-            st.subheader("📊 Detection Summary")
-            
-            # Calculate enhanced metrics
-            detections = results['detections']
-            severity_counts = {}
-            total_area = 0
-            max_confidence = 0
-            
-            for detection in detections:
-                severity = detection['severity']
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                total_area += detection['area']
-                max_confidence = max(max_confidence, detection['confidence'])
-            
-            # Metrics grid
-            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
-            
-            with col_m1:
-                st.metric("Total Detections", len(detections))
-            
-            with col_m2:
-                avg_confidence = np.mean([d['confidence'] for d in detections]) if detections else 0
-                st.metric("Avg Confidence", f"{avg_confidence:.1%}")
-            
-            with col_m3:
-                st.metric("Total Area", f"{total_area:,.0f} px²")
-            
-            with col_m4:
-                max_severity = "None"
-                if severity_counts:
-                    severity_order = ['Low', 'Medium', 'High', 'Critical']
-                    for sev in reversed(severity_order):
-                        if sev in severity_counts:
-                            max_severity = sev
-                            break
-                
-                st.metric("Max Severity", max_severity)
-            
-            # Severity breakdown chart
-            if detections:
-                st.subheader("📈 Severity Distribution")
-                
-                severity_data = pd.DataFrame([
-                    {'Severity': k, 'Count': v} for k, v in severity_counts.items()
-                ])
-                
-                fig = px.bar(severity_data, x='Severity', y='Count',
-                           color='Severity',
-                           color_discrete_map={
-                               'Critical': '#d62728',
-                               'High': '#ff7f0e', 
-                               'Medium': '#ffbb78',
-                               'Low': '#2ca02c'
-                           })
-                fig.update_layout(showlegend=False, height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            
-        else:
-            st.info("Upload an image and run analysis to see results here.")
-            
-            # Show sample analysis capabilities
-            st.subheader("🔬 Analysis Capabilities")
-            
-            capabilities = [
-                "🎯 Multi-method detection (Color, Texture, Edge)",
-                "📊 Confidence scoring and risk assessment", 
-                "🏷️ Severity classification (Low to Critical)",
-                "📐 Precise area and dimension measurements",
-                "🗺️ GPS coordinates and location mapping",
-                "📈 Historical trend analysis",
-                "⚠️ Real-time alert generation",
-                "📋 Regulatory compliance reporting"
-            ]
+        # Display annotated image
+        st.subheader("🔍 Detected Corrosion Areas")
+        st.image(st.session_state.processed_png, caption="AI Detection Results", use_container_width=True)
+        
+        # Enhanced metrics display
+        st.subheader("📊 Detection Summary")
+        
+        # Calculate enhanced metrics
+        detections = results['detections']
+        severity_counts = Counter(d['severity'] for d in detections)
+        areas = np.fromiter((d['area'] for d in detections), dtype=np.float64, count=len(detections))
+        confidences = np.fromiter((d['confidence'] for d in detections), dtype=np.float64, count=len(detections))
+        total_area = areas.sum()
+        avg_confidence = confidences.mean() if detections else 0
+        
+        # Metrics grid
+        col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+        
+        with col_m1:
+            st.metric("Total Detections", len(detections))
+        
+        with col_m2:
+            st.metric("Avg Confidence", f"{avg_confidence:.1%}")
+        
+        with col_m3:
+            st.metric("Total Area", f"{total_area:,.0f} px²")
+        
+        with col_m4:
+            max_severity = max(severity_counts, key=SEVERITY_RANK.get) if severity_counts else "None"
+            st.metric("Max Severity", max_severity)
+        
+        # Severity breakdown chart
+        if detections:
+            st.subheader("📈 Severity Distribution")
             
-            for capability in capabilities:
-                st.write(capability)
+            fig = _severity_figure(tuple(severity_counts.items()))
+            st.plotly_chart(fig, use_container_width=True)
+        
+    else:
+        st.info("Upload an image and run analysis to see results here.")
+        
+        # Show sample analysis capabilities
+        st.subheader("🔬 Analysis Capabilities")
+        
+        capabilities = [
+            "🎯 Multi-method detection (Color, Texture, Edge)",
+            "📊 Confidence scoring and risk assessment", 
+            "🏷️ Severity classification (Low to Critical)",
+            "📐 Precise area and dimension measurements",
+            "🗺️ GPS coordinates and location mapping",
+            "📈 Historical trend analysis",
+            "⚠️ Real-time alert generation",
+            "📋 Regulatory compliance reporting"
+        ]
+        
+        st.markdown("  \n".join(capabilities))
 
 def render_analytics_page():
     """Render analytics dashboard"""
@@ -339,22 +453,12 @@ def render_trend_analysis():
     with col2:
         segment_filter = st.multiselect("Pipeline Segments", ["All", "Segment A", "Segment B", "Segment C"])
     
-    # Sample trend data
-    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='M')
-    corrosion_rate = np.random.normal(15, 3, len(dates))
-    detection_count = np.random.poisson(12, len(dates))
+    fig, fig2 = _trend_figures()
     
     # Corrosion rate trend
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=corrosion_rate, mode='lines+markers', 
-                           name='Corrosion Rate (mm/year)', line=dict(color='red')))
-    fig.update_layout(title="Corrosion Rate Trend", xaxis_title="Date", yaxis_title="Rate (mm/year)")
     st.plotly_chart(fig, use_container_width=True)
     
     # Detection frequency trend
-    fig2 = go.Figure()
-    fig2.add_trace(go.Bar(x=dates, y=detection_count, name='Monthly Detections'))
-    fig2.update_layout(title="Detection Frequency", xaxis_title="Date", yaxis_title="Count")
     st.plotly_chart(fig2, use_container_width=True)
 
 def render_predictive_analytics():
@@ -363,31 +467,12 @@ def render_predictive_analytics():
     
     st.subheader("Remaining Useful Life Prediction")
     
-    # Sample RUL data
-    segments = ['Segment A', 'Segment B', 'Segment C', 'Segment D']
-    remaining_life = [2.5, 8.2, 5.7, 12.1]  # years
-    confidence = [0.85, 0.92, 0.78, 0.88]
-    
-    df = pd.DataFrame({
-        'Segment': segments,
-        'Remaining Life (Years)': remaining_life,
-        'Confidence': confidence
-    })
-    
-    st.dataframe(df, use_container_width=True)
+    st.dataframe(_rul_df(), use_container_width=True)
     
     # Failure probability
     st.subheader("Failure Probability Analysis")
     
-    time_horizon = np.arange(1, 11)  # 1-10 years
-    failure_prob = 1 - np.exp(-0.1 * time_horizon)  # Exponential failure model
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=time_horizon, y=failure_prob*100, mode='lines+markers',
-                           name='Failure Probability', line=dict(color='red')))
-    fig.update_layout(title="Failure Probability Over Time", 
-                     xaxis_title="Years", yaxis_title="Probability (%)")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_failure_probability_figure(), use_container_width=True)
 
 def render_maintenance_page():
     """Render maintenance planning page"""
@@ -469,9 +554,8 @@ def render_reports_page():
             
             # Generate all report formats
             try:
-                pdf_data = enhanced_report_generator.generate_pdf_report(report_data)
-                excel_data = enhanced_report_generator.generate_excel_report(report_data)
-                word_data = enhanced_report_generator.generate_word_report(report_data)
+                reports = enhanced_report_generator.generate_all(report_data)
+                pdf_data, excel_data, word_data = reports['pdf'], reports['excel'], reports['word']
                 
                 st.success("✅ Professional reports generated successfully!")
                 
@@ -587,15 +671,7 @@ def render_settings_page():
     with settings_tabs[4]:
         st.subheader("User Management")
         
-        # Sample user table
-        users_data = pd.DataFrame({
-            'Username': ['john.doe', 'jane.smith', 'mike.wilson'],
-            'Role': ['Administrator', 'Inspector', 'Analyst'],
-            'Last Login': ['2025-06-30', '2025-06-29', '2025-06-28'],
-            'Status': ['Active', 'Active', 'Active']
-        })
-        
-        st.dataframe(users_data, use_container_width=True)
+        st.dataframe(_users_df(), use_container_width=True)
         
         if st.button("Add New User"):
             st.info("User management interface would open here")
@@ -1,19 +1,101 @@
+import io
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, TextIO
 import json
 
+# Section rules, built once instead of on every report
+_HEADER_RULE = '=' * 50
+_SECTION_RULE = '-' * 20
+_WIDE_SECTION_RULE = '-' * 30
+_END_RULE = '=' * 60
+
+# Severity levels, most severe first
+_SEVERITY_ORDER = ('Critical', 'High', 'Medium', 'Low')
+
+# Report text that does not depend on the inspection data
+_CLEAN_INSPECTION = f"""INSPECTION RESULTS
+{_SECTION_RULE}
+
+✓ NO CORROSION DETECTED
+
+The AI-powered analysis of the pipeline image did not identify any areas 
+of concern that match corrosion patterns. The pipeline surface appears 
+to be in good condition in the inspected area.
+
+ANALYSIS PARAMETERS:
+- Detection sensitivity: Standard
+- Minimum area threshold: Applied
+- Color analysis: Completed
+- Texture analysis: Completed
+- Edge detection: Completed
+
+This clean inspection result indicates the pipeline coating and surface 
+integrity appear satisfactory in the examined section."""
+
+_TECHNICAL_DETAILS = f"""TECHNICAL ANALYSIS DETAILS
+{_WIDE_SECTION_RULE}
+
+DETECTION METHODOLOGY:
+- Computer Vision Algorithm: Multi-method corrosion detection
+- Color Space Analysis: HSV color space for rust detection
+- Texture Analysis: Local standard deviation patterns
+- Edge Detection: Canny edge detection with morphological operations
+- Confidence Scoring: Weighted combination of color, texture, and shape features
+
+ANALYSIS PARAMETERS:
+- Pipeline Type: {{pipeline_type}}
+- Detection Sensitivity: Configurable threshold-based
+- Minimum Area Filter: Applied to reduce false positives
+- Color Range Optimization: Pipeline-type specific tuning
+
+ALGORITHM CONFIDENCE:
+- This system provides assistance in corrosion detection
+- Manual verification recommended for all detections
+- False positive rate varies with image quality and lighting conditions
+- Best results achieved with high-resolution, well-lit images
+
+LIMITATIONS:
+- Lighting conditions affect detection accuracy
+- Surface coatings may mask early-stage corrosion
+- System trained on common corrosion patterns
+- Manual inspection required for verification"""
+
+_FOOTER_NOTES = f"""REPORT VALIDATION
+{_SECTION_RULE}
+
+This report was generated by an AI-powered corrosion detection system.
+All findings should be validated through manual inspection by qualified personnel.
+
+QUALITY ASSURANCE:
+- Automated detection algorithms applied
+- Multi-method validation used
+- Confidence scoring provided for all detections
+- Professional review recommended
+
+DISCLAIMERS:
+- This analysis provides assistance in identifying potential corrosion areas
+- Manual verification is required for all findings
+- Environmental factors may affect detection accuracy
+- Regular system calibration and validation recommended
+
+"""
+
 class ReportGenerator:
     """
     Generate comprehensive reports for corrosion detection results.
     """
     
     def __init__(self):
-        self.report_template = {
-            'header': self._get_header_template(),
-            'summary': self._get_summary_template(),
-            'detailed': self._get_detailed_template(),
-            'recommendations': self._get_recommendations_template(),
-            'footer': self._get_footer_template()
+        # Section sequence per report type, resolved once rather than branched on per report
+        self._standard_sections = (
+            self._write_header,
+            self._write_summary,
+            self._write_detailed_findings,
+            self._write_recommendations,
+            self._write_footer
+        )
+        self._sections = {
+            'Technical': self._standard_sections[:-1] + (self._write_technical_details,) + self._standard_sections[-1:]
         }
     
     def generate_report(self, data: Dict[str, Any]) -> str:
@@ -26,80 +108,49 @@ class ReportGenerator:
         Returns:
             Formatted report string
         """
-        report_sections = []
-        
-        # Header
-        report_sections.append(self._generate_header(data))
-        
-        # Executive Summary
-        report_sections.append(self._generate_summary(data))
-        
-        # Detailed Findings
-        if data.get('detections'):
-            report_sections.append(self._generate_detailed_findings(data))
-        else:
-            report_sections.append(self._generate_clean_inspection(data))
+        buffer = io.StringIO()
+        self.write_report(data, buffer)
+        return buffer.getvalue()
+    
+    def write_report(self, data: Dict[str, Any], out: TextIO) -> None:
+        """
+        Write a comprehensive corrosion detection report to a text stream.
         
-        # Recommendations
-        report_sections.append(self._generate_recommendations(data))
+        Sections are written as they are produced, so a file or response
+        body receives the report without it being assembled in memory first.
         
-        # Technical Details
-        if data.get('report_type') == 'Technical':
-            report_sections.append(self._generate_technical_details(data))
+        Args:
+            data: Dictionary containing report data
+            out: Writable text stream
+        """
+        sections = self._sections.get(data.get('report_type'), self._standard_sections)
         
-        # Footer
-        report_sections.append(self._generate_footer(data))
+        # Stamp the report once so the header and footer agree
+        data = {**data, '_generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
-        return '\n\n'.join(report_sections)
+        sections[0](data, out)
+        for write_section in sections[1:]:
+            out.write('\n\n')
+            write_section(data, out)
     
-    def _get_header_template(self) -> str:
-        return """
-PIPELINE CORROSION DETECTION REPORT
-{'='*50}
-AI-Powered Inspection System
-"""
-    
-    def _get_summary_template(self) -> str:
-        return """
-EXECUTIVE SUMMARY
-{'-'*20}
-"""
-    
-    def _get_detailed_template(self) -> str:
-        return """
-DETAILED FINDINGS
-{'-'*20}
-"""
-    
-    def _get_recommendations_template(self) -> str:
-        return """
-RECOMMENDATIONS & NEXT STEPS
-{'-'*30}
-"""
-    
-    def _get_footer_template(self) -> str:
-        return """
-REPORT VALIDATION
-{'-'*20}
-"""
-    
-    def _generate_header(self, data: Dict[str, Any]) -> str:
-        """Generate report header section."""
-        return f"""PIPELINE CORROSION DETECTION REPORT
-{'='*50}
+    def _write_header(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write report header section."""
+        get = data.get
+        out.write(f"""PIPELINE CORROSION DETECTION REPORT
+{_HEADER_RULE}
 AI-Powered Inspection System
 
 INSPECTION DETAILS:
-- Inspector: {data.get('inspector_name', 'Unknown')}
-- Location: {data.get('location', 'Unknown')}
-- Date: {data.get('inspection_date', 'Unknown')}
-- Pipeline Type: {data.get('pipeline_type', 'Unknown')}
-- Image File: {data.get('image_name', 'Unknown')}
-- Report Type: {data.get('report_type', 'Standard')}
-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
+- Inspector: {get('inspector_name', 'Unknown')}
+- Location: {get('location', 'Unknown')}
+- Date: {get('inspection_date', 'Unknown')}
+- Pipeline Type: {get('pipeline_type', 'Unknown')}
+- Image File: {get('image_name', 'Unknown')}
+- Report Type: {get('report_type', 'Standard')}
+- Generated: {data['_generated_at']}""")
     
-    def _generate_summary(self, data: Dict[str, Any]) -> str:
-        """Generate executive summary section."""
+    def _write_summary(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write executive summary section."""
         total_detections = data.get('total_detections', 0)
         avg_confidence = data.get('avg_confidence', 0)
         severity_counts = data.get('severity_counts', {})
@@ -121,8 +172,8 @@ INSPECTION DETAILS:
             overall_status = "LOW RISK"
             status_description = "Low severity corrosion detected for monitoring."
         
-        summary = f"""EXECUTIVE SUMMARY
-{'-'*20}
+        out.write(f"""EXECUTIVE SUMMARY
+{_SECTION_RULE}
 
 OVERALL STATUS: {overall_status}
 {status_description}
@@ -131,34 +182,33 @@ DETECTION STATISTICS:
 - Total Corrosion Areas: {total_detections}
 - Average Confidence: {avg_confidence:.1%}
 
-SEVERITY BREAKDOWN:"""
+SEVERITY BREAKDOWN:""")
         
         if severity_counts:
-            for severity in ['Critical', 'High', 'Medium', 'Low']:
+            for severity in _SEVERITY_ORDER:
                 count = severity_counts.get(severity, 0)
                 if count > 0:
-                    summary += f"\n- {severity}: {count} area(s)"
+                    out.write(f"\n- {severity}: {count} area(s)")
         else:
-            summary += "\n- No corrosion detected"
-        
-        return summary
+            out.write("\n- No corrosion detected")
     
-    def _generate_detailed_findings(self, data: Dict[str, Any]) -> str:
-        """Generate detailed findings section."""
+    def _write_detailed_findings(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write detailed findings section."""
         detections = data.get('detections', [])
         
         if not detections:
-            return self._generate_clean_inspection(data)
+            self._write_clean_inspection(data, out)
+            return
         
-        detailed = f"""DETAILED FINDINGS
-{'-'*20}
+        out.write(f"""DETAILED FINDINGS
+{_SECTION_RULE}
 
 Total corrosion areas identified: {len(detections)}
 
-INDIVIDUAL CORROSION AREAS:"""
+INDIVIDUAL CORROSION AREAS:""")
         
         for i, detection in enumerate(detections, 1):
-            detailed += f"""
+            out.write(f"""
 
 {i}. CORROSION AREA C{detection['id']:03d}
    Location: X={detection['bbox'][0]}, Y={detection['bbox'][1]}
@@ -170,41 +220,22 @@ INDIVIDUAL CORROSION AREAS:"""
    Shape Characteristics:
    - Circularity: {detection.get('circularity', 'N/A')}
    - Aspect Ratio: {detection.get('aspect_ratio', 'N/A')}
-   - Extent: {detection.get('extent', 'N/A')}"""
-        
-        return detailed
+   - Extent: {detection.get('extent', 'N/A')}""")
     
-    def _generate_clean_inspection(self, data: Dict[str, Any]) -> str:
-        """Generate section for clean inspection (no corrosion found)."""
-        return f"""INSPECTION RESULTS
-{'-'*20}
-
-✓ NO CORROSION DETECTED
-
-The AI-powered analysis of the pipeline image did not identify any areas 
-of concern that match corrosion patterns. The pipeline surface appears 
-to be in good condition in the inspected area.
-
-ANALYSIS PARAMETERS:
-- Detection sensitivity: Standard
-- Minimum area threshold: Applied
-- Color analysis: Completed
-- Texture analysis: Completed
-- Edge detection: Completed
-
-This clean inspection result indicates the pipeline coating and surface 
-integrity appear satisfactory in the examined section."""
+    def _write_clean_inspection(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write section for clean inspection (no corrosion found)."""
+        out.write(_CLEAN_INSPECTION)
     
-    def _generate_recommendations(self, data: Dict[str, Any]) -> str:
-        """Generate recommendations section."""
+    def _write_recommendations(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write recommendations section."""
         detections = data.get('detections', [])
         severity_counts = data.get('severity_counts', {})
         
-        recommendations = f"""RECOMMENDATIONS & NEXT STEPS
-{'-'*30}"""
+        out.write(f"""RECOMMENDATIONS & NEXT STEPS
+{_WIDE_SECTION_RULE}""")
         
         if not detections:
-            recommendations += """
+            out.write("""
 
 MAINTENANCE RECOMMENDATIONS:
 ✓ Continue routine inspection schedule
@@ -214,110 +245,65 @@ MAINTENANCE RECOMMENDATIONS:
 PREVENTIVE MEASURES:
 - Maintain current corrosion protection systems
 - Continue environmental monitoring
-- Ensure proper coating maintenance schedule"""
+- Ensure proper coating maintenance schedule""")
         else:
             # Priority actions based on severity
             if severity_counts.get('Critical', 0) > 0:
-                recommendations += f"""
+                out.write(f"""
 
 IMMEDIATE ACTIONS REQUIRED:
 ⚠️ CRITICAL corrosion areas detected - Immediate inspection and repair needed
 - Isolate affected pipeline sections if possible
 - Deploy field inspection team within 24 hours
 - Prepare emergency repair materials
-- Consider temporary operational restrictions"""
+- Consider temporary operational restrictions""")
             
             if severity_counts.get('High', 0) > 0:
-                recommendations += f"""
+                out.write(f"""
 
 HIGH PRIORITY ACTIONS (Within 30 days):
 - Schedule detailed manual inspection of identified areas
 - Prepare maintenance materials and equipment
 - Plan pipeline downtime for repairs
-- Assess coating failure patterns"""
+- Assess coating failure patterns""")
             
             if severity_counts.get('Medium', 0) > 0:
-                recommendations += f"""
+                out.write(f"""
 
 MEDIUM PRIORITY ACTIONS (Within 90 days):
 - Include in next scheduled maintenance window
 - Monitor progression with follow-up imaging
 - Plan preventive coating repairs
-- Review environmental factors contributing to corrosion"""
+- Review environmental factors contributing to corrosion""")
             
             if severity_counts.get('Low', 0) > 0:
-                recommendations += f"""
+                out.write(f"""
 
 MONITORING ACTIONS:
 - Document locations for trending analysis
 - Include in routine inspection checklist
 - Monitor environmental conditions
-- Consider preventive treatments"""
+- Consider preventive treatments""")
             
-            recommendations += f"""
+            out.write(f"""
 
 FOLLOW-UP ACTIONS:
 - Validate AI detections with manual inspection
 - Document all findings in maintenance management system
 - Update inspection frequency based on findings
 - Review corrosion protection system effectiveness
-- Consider additional protective measures if patterns emerge"""
-        
-        return recommendations
+- Consider additional protective measures if patterns emerge""")
     
-    def _generate_technical_details(self, data: Dict[str, Any]) -> str:
-        """Generate technical details section for technical reports."""
-        return f"""TECHNICAL ANALYSIS DETAILS
-{'-'*30}
-
-DETECTION METHODOLOGY:
-- Computer Vision Algorithm: Multi-method corrosion detection
-- Color Space Analysis: HSV color space for rust detection
-- Texture Analysis: Local standard deviation patterns
-- Edge Detection: Canny edge detection with morphological operations
-- Confidence Scoring: Weighted combination of color, texture, and shape features
-
-ANALYSIS PARAMETERS:
-- Pipeline Type: {data.get('pipeline_type', 'Unknown')}
-- Detection Sensitivity: Configurable threshold-based
-- Minimum Area Filter: Applied to reduce false positives
-- Color Range Optimization: Pipeline-type specific tuning
-
-ALGORITHM CONFIDENCE:
-- This system provides assistance in corrosion detection
-- Manual verification recommended for all detections
-- False positive rate varies with image quality and lighting conditions
-- Best results achieved with high-resolution, well-lit images
-
-LIMITATIONS:
-- Lighting conditions affect detection accuracy
-- Surface coatings may mask early-stage corrosion
-- System trained on common corrosion patterns
-- Manual inspection required for verification"""
+    def _write_technical_details(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write technical details section for technical reports."""
+        out.write(_TECHNICAL_DETAILS.format(pipeline_type=data.get('pipeline_type', 'Unknown')))
     
-    def _generate_footer(self, data: Dict[str, Any]) -> str:
-        """Generate report footer section."""
-        return f"""REPORT VALIDATION
-{'-'*20}
-
-This report was generated by an AI-powered corrosion detection system.
-All findings should be validated through manual inspection by qualified personnel.
-
-QUALITY ASSURANCE:
-- Automated detection algorithms applied
-- Multi-method validation used
-- Confidence scoring provided for all detections
-- Professional review recommended
-
-DISCLAIMERS:
-- This analysis provides assistance in identifying potential corrosion areas
-- Manual verification is required for all findings
-- Environmental factors may affect detection accuracy
-- Regular system calibration and validation recommended
-
-Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    def _write_footer(self, data: Dict[str, Any], out: TextIO) -> None:
+        """Write report footer section."""
+        out.write(_FOOTER_NOTES)
+        out.write(f"""Report Generated: {data['_generated_at']}
 System Version: Pipeline Corrosion Detection v1.0
 Inspector: {data.get('inspector_name', 'Unknown')}
 
-{'='*60}
-END OF REPORT"""
+{_END_RULE}
+END OF REPORT""")
@@ -1,15 +1,42 @@
 import cv2
 import numpy as np
 from PIL import Image
-import io
 import base64
+import os
+import threading
+from collections import Counter
 from typing import Tuple, Optional, Union
 
+# Display colors by severity level
+_SEVERITY_COLORS = {
+    'Critical': '#FF0000',
+    'High': '#FF8C00',
+    'Medium': '#FFD700',
+    'Low': '#32CD32'
+}
+_DEFAULT_SEVERITY_COLOR = '#808080'
+
+# Leading bytes expected for each accepted file extension
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_JPEG_SIGNATURE = b'\xff\xd8\xff'
+_IMAGE_SIGNATURES = {
+    '.png': (_PNG_SIGNATURE,),
+    '.jpg': (_JPEG_SIGNATURE,),
+    '.jpeg': (_JPEG_SIGNATURE,),
+    '.bmp': (b'BM',),
+    '.tiff': (b'II*\x00', b'MM\x00*')  # little- and big-endian
+}
+_IMAGE_HEADER_SIZE = 32
+
 class ImageProcessor:
     """
     Utility class for image processing operations.
     """
     
+    # Contrast enhancement handle and LAB scratch buffer reused across calls.
+    # Both carry per-call state, so each thread keeps its own.
+    _local = threading.local()
+    
     @staticmethod
     def pil_to_opencv(pil_image: Image.Image) -> np.ndarray:
         """
@@ -25,8 +52,9 @@ class ImageProcessor:
         if pil_image.mode != 'RGB':
             pil_image = pil_image.convert('RGB')
         
-        # Convert to numpy array and change RGB to BGR
-        opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        # Convert to numpy array and swap RGB to BGR in place
+        opencv_image = np.array(pil_image)
+        cv2.cvtColor(opencv_image, cv2.COLOR_RGB2BGR, dst=opencv_image)
         return opencv_image
     
     @staticmethod
@@ -40,10 +68,10 @@ class ImageProcessor:
         Returns:
             PIL Image object
         """
-        # Convert BGR to RGB
-        rgb_image = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2RGB)
-        # Convert to PIL Image
-        pil_image = Image.fromarray(rgb_image)
+        # Let PIL's raw decoder unpack BGR straight into an RGB image
+        height, width = opencv_image.shape[:2]
+        pil_image = Image.frombuffer('RGB', (width, height), np.ascontiguousarray(opencv_image),
+                                     'raw', 'BGR', 0, 1)
         return pil_image
     
     @staticmethod
@@ -74,8 +102,8 @@ class ImageProcessor:
         
         return image
     
-    @staticmethod
-    def enhance_image_quality(image: np.ndarray) -> np.ndarray:
+    @classmethod
+    def enhance_image_quality(cls, image: np.ndarray) -> np.ndarray:
         """
         Enhance image quality for better detection.
         
@@ -85,17 +113,23 @@ class ImageProcessor:
         Returns:
             Enhanced image
         """
-        # Convert to LAB color space
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        local = cls._local
+        if not hasattr(local, 'clahe'):
+            local.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+            local.lab = None
         
-        # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l_enhanced = clahe.apply(l)
+        # Convert to LAB color space, reusing the buffer while the image size is unchanged.
+        # LAB is always three channels, whatever the input's channel count.
+        lab_shape = image.shape[:2] + (3,)
+        lab = local.lab
+        if lab is None or lab.shape != lab_shape or lab.dtype != image.dtype:
+            lab = local.lab = np.empty(lab_shape, image.dtype)
+        cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=lab)
         
-        # Merge channels back
-        enhanced_lab = cv2.merge([l_enhanced, a, b])
-        enhanced_image = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
+        # Apply CLAHE to the L channel, writing it back in place
+        lab[:, :, 0] = local.clahe.apply(lab[:, :, 0])
+        
+        enhanced_image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         
         return enhanced_image
     
@@ -112,13 +146,18 @@ class ImageProcessor:
         """
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
+        # Two passes over the image: mean with standard deviation, then min with max
+        mean, std = cv2.meanStdDev(gray)
+        mean, std = float(mean[0, 0]), float(std[0, 0])
+        min_brightness, max_brightness, _, _ = cv2.minMaxLoc(gray)
+        
         stats = {
             'shape': image.shape,
-            'mean_brightness': np.mean(gray),
-            'std_brightness': np.std(gray),
-            'min_brightness': np.min(gray),
-            'max_brightness': np.max(gray),
-            'contrast': np.std(gray) / np.mean(gray) if np.mean(gray) > 0 else 0
+            'mean_brightness': mean,
+            'std_brightness': std,
+            'min_brightness': min_brightness,
+            'max_brightness': max_brightness,
+            'contrast': std / mean if mean > 0 else 0
         }
         
         return stats
@@ -134,16 +173,9 @@ class ImageProcessor:
         Returns:
             Base64 encoded string
         """
-        # Convert BGR to RGB
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Convert to PIL Image
-        pil_image = Image.fromarray(rgb_image)
-        
-        # Convert to base64
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format='PNG')
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        # Encode the BGR array directly; a light compression level keeps embedding fast
+        _, buffer = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        image_base64 = base64.b64encode(buffer).decode('ascii')
         
         return image_base64
 
@@ -158,7 +190,8 @@ class ValidationUtils:
         Validate uploaded image file.
         
         Args:
-            uploaded_file: Streamlit uploaded file object
+            uploaded_file: Streamlit uploaded file object, or a path to an
+                image file on disk
             
         Returns:
             Tuple of (is_valid, error_message)
@@ -166,23 +199,43 @@ class ValidationUtils:
         if uploaded_file is None:
             return False, "No file uploaded"
         
+        # Files on disk are checked from their metadata and first bytes, never loaded whole
+        on_disk = isinstance(uploaded_file, (str, os.PathLike))
+        if on_disk:
+            file_name = os.fspath(uploaded_file)
+            try:
+                file_size = os.path.getsize(file_name)
+            except OSError as e:
+                return False, f"Invalid image file: {str(e)}"
+        else:
+            file_name, file_size = uploaded_file.name, uploaded_file.size
+        
         # Check file size (max 10MB)
-        if uploaded_file.size > 10 * 1024 * 1024:
+        if file_size > 10 * 1024 * 1024:
             return False, "File size too large (max 10MB)"
         
         # Check file extension
         allowed_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']
-        file_extension = uploaded_file.name.lower().split('.')[-1]
-        if f'.{file_extension}' not in allowed_extensions:
+        file_extension = os.path.splitext(file_name)[1].lower()
+        if file_extension not in allowed_extensions:
             return False, f"Unsupported file format. Allowed: {', '.join(allowed_extensions)}"
         
         try:
-            # Try to open the image
-            image = Image.open(uploaded_file)
-            image.verify()  # Verify it's a valid image
-            return True, ""
+            # Check the format signature; only the header is read, not the whole payload
+            if on_disk:
+                with open(file_name, 'rb') as image_file:
+                    header = image_file.read(_IMAGE_HEADER_SIZE)
+            else:
+                header = uploaded_file.read(_IMAGE_HEADER_SIZE)
+                uploaded_file.seek(0)
         except Exception as e:
             return False, f"Invalid image file: {str(e)}"
+        
+        # The contents must be in the format the extension claims
+        if not header.startswith(_IMAGE_SIGNATURES[file_extension]):
+            return False, f"Invalid image file: contents do not match the {file_extension} extension"
+        
+        return True, ""
     
     @staticmethod
     def validate_detection_parameters(sensitivity: float, min_area: int) -> Tuple[bool, str]:
@@ -241,13 +294,7 @@ def get_severity_color(severity: str) -> str:
     Returns:
         Color code string
     """
-    colors = {
-        'Critical': '#FF0000',
-        'High': '#FF8C00',
-        'Medium': '#FFD700',
-        'Low': '#32CD32'
-    }
-    return colors.get(severity, '#808080')
+    return _SEVERITY_COLORS.get(severity, _DEFAULT_SEVERITY_COLOR)
 
 def calculate_detection_summary(detections: list) -> dict:
     """
@@ -268,18 +315,14 @@ def calculate_detection_summary(detections: list) -> dict:
             'severity_distribution': {}
         }
     
-    total_area = sum(d['area'] for d in detections)
-    confidences = [d['confidence'] for d in detections]
-    severities = [d['severity'] for d in detections]
-    
-    severity_counts = {}
-    for severity in severities:
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+    count = len(detections)
+    areas = np.fromiter((d['area'] for d in detections), dtype=np.float64, count=count)
+    confidences = np.fromiter((d['confidence'] for d in detections), dtype=np.float64, count=count)
     
     return {
-        'total_count': len(detections),
-        'total_area': total_area,
-        'avg_confidence': np.mean(confidences),
-        'max_confidence': np.max(confidences),
-        'severity_distribution': severity_counts
+        'total_count': count,
+        'total_area': float(areas.sum()),
+        'avg_confidence': float(confidences.mean()),
+        'max_confidence': float(confidences.max()),
+        'severity_distribution': dict(Counter(d['severity'] for d in detections))
     }